@@ -0,0 +1,214 @@
+#!python3
+
+import argparse
+import asyncio as aio
+import socket
+import threading
+import time
+import DTCConstants as DTC
+from DTCClient import DTCClient, DTCClientAsync
+from DTCLatency import LatencyHistogram
+from DTCEncoding import JSON_BACKENDS, JSON, JsonCodec, JsonCompactCodec, FrameBuffer, ENCODING_LAYOUT
+from DTCTransport import TRANSPORTS
+
+"""
+Benchmarks message handling on a log recorded by DTCClient.py
+"""
+
+def LoadMessages(filename, limit):
+
+    messages = []
+    with open(filename, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            messages.append(JSON.loads(line))
+            if len(messages) == limit:
+                break
+
+    return messages
+
+def Best(func, repeat):
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def BenchJson(messages, repeat):
+
+    print('%-8s %-18s %14s %14s' % ('backend', 'codec', 'decode msg/s', 'encode msg/s'))
+
+    for name, factory in JSON_BACKENDS.items():
+
+        try:
+            backend = factory()
+        except ImportError:
+            print('%-8s not installed' % name)
+            continue
+
+        for codec in (JsonCodec(backend), JsonCompactCodec(backend)):
+
+            if isinstance(codec, JsonCompactCodec):
+                msgs = [m for m in messages if m.get('Type') in codec.fields]
+            else:
+                msgs = messages
+
+            # decode the same way the clients do, from views into a frame buffer
+            data = b''.join(codec.encode(m) for m in msgs)
+            frames = FrameBuffer(codec, len(data))
+            frames.feed(data)
+            views = frames.frames()
+
+            decode = Best(lambda: [codec.decode(f) for f in views], repeat)
+            encode = Best(lambda: [codec.encode(m) for m in msgs], repeat)
+
+            print('%-8s %-18s %14d %14d' % (name, type(codec).__name__,
+                                            len(msgs) / decode, len(msgs) / encode))
+
+def Serve(data, connections):
+
+    # a DTC server that answers the encoding request and sends data, or what
+    # data() returns chunk by chunk
+    server = socket.create_server(('127.0.0.1', 0))
+
+    def run():
+        for _ in range(connections):
+            conn, _ = server.accept()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with conn:
+                req = conn.recv(ENCODING_LAYOUT.size, socket.MSG_WAITALL)
+                encoding = ENCODING_LAYOUT.unpack(req)[3]
+                conn.sendall(ENCODING_LAYOUT.pack(ENCODING_LAYOUT.size, DTC.ENCODING_RESPONSE,
+                                                  DTC.CURRENT_VERSION, encoding, b'DTC\x00'))
+                for chunk in (data() if callable(data) else (data,)):
+                    conn.sendall(chunk)
+                # wait for the client to hang up, so what it sent is read
+                conn.shutdown(socket.SHUT_WR)
+                while conn.recv(1 << 16):
+                    pass
+        server.close()
+
+    threading.Thread(target=run, daemon=True).start()
+    return server.getsockname()[1]
+
+async def Receive(port, **kwargs):
+
+    client = DTCClientAsync(**kwargs)
+    start = time.perf_counter()
+    await client.connect('127.0.0.1', port)
+    await client.logon('', '')
+    count = 0
+    async for batch in client.messages_batch():
+        count += len(batch)
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return count, elapsed
+
+def BenchTransport(messages, repeat):
+
+    # receive the log from a local socket with each transport, decoding every
+    # message, on the default event loop and on uvloop if installed
+    loops = [('asyncio', aio.new_event_loop)]
+    try:
+        import uvloop
+        loops.append(('uvloop', uvloop.new_event_loop))
+    except ImportError:
+        print('uvloop not installed')
+
+    codec = JsonCodec()
+    data = b''.join(codec.encode(m) for m in messages)
+
+    print('%-8s %-10s %-6s %14s' % ('loop', 'transport', 'batch', 'msg/s'))
+
+    for loop_name, new_loop in loops:
+        for transport in TRANSPORTS:
+            for batch in (False, True):
+                best = None
+                for _ in range(repeat):
+                    port = Serve(data, 1)
+                    loop = new_loop()
+                    try:
+                        count, elapsed = loop.run_until_complete(Receive(port, transport=transport, batch=batch))
+                    finally:
+                        loop.close()
+                    best = elapsed if best is None else min(best, elapsed)
+                print('%-8s %-10s %-6s %14d' % (loop_name, transport, batch, count / best))
+
+def Paced(count, interval):
+
+    # trades stamped with the time they are sent, one per interval seconds
+    codec = JsonCodec()
+
+    def chunks():
+        for i in range(count):
+            yield codec.encode({'Type': DTC.MARKET_DATA_UPDATE_TRADE, 'SymbolID': 1, 'Price': i, 'DateTime': time.time()})
+            time.sleep(interval)
+
+    return chunks
+
+def BenchThreaded(messages, repeat):
+
+    # DTCClient with a receiver thread and queue, or receiving in the handler's
+    # thread (direct): throughput on the log, and wire to handler latency of
+    # paced trades
+    data = b''.join(JsonCodec().encode(m) for m in messages)
+
+    print('%-8s %-6s %14s %12s %12s' % ('mode', 'batch', 'msg/s', 'p50 us', 'p99 us'))
+
+    for direct in (False, True):
+        for batch in (False, True):
+
+            best = None
+            for _ in range(repeat):
+                client = DTCClient(direct=direct, batch=batch)
+                client.connect('127.0.0.1', Serve(data, 1))
+                start = time.perf_counter()
+                client.logon('', '')
+                client.run(lambda message: None)
+                elapsed = time.perf_counter() - start
+                client.close()
+                best = elapsed if best is None else min(best, elapsed)
+
+            hist = LatencyHistogram()
+            def record(message):
+                now = time.time()
+                for msg in (message if batch else (message,)):
+                    hist.record(now - msg['DateTime'])
+
+            client = DTCClient(direct=direct, batch=batch)
+            client.connect('127.0.0.1', Serve(Paced(2000, 0.0005), 1))
+            client.logon('', '')
+            client.run(record)
+            client.close()
+
+            print('%-8s %-6s %14d %12.1f %12.1f' % ('direct' if direct else 'queue', batch, len(messages) / best,
+                                                   hist.percentile(50) * 1e6, hist.percentile(99) * 1e6))
+
+def Main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--input', '-i', required=True, help="log file recorded by DTCClient.py")
+    parser.add_argument('--bench', '-b', default='json', choices=['json', 'transport', 'threaded'], help="what to benchmark")
+    parser.add_argument('--limit', '-n', type=int, default=200000, help="max number of messages to load")
+    parser.add_argument('--repeat', '-r', type=int, default=5, help="runs per measurement, best is reported")
+
+    args = parser.parse_args()
+
+    messages = LoadMessages(args.input, args.limit)
+    print('Loaded %d messages from %s' % (len(messages), args.input))
+
+    if args.bench == 'json':
+        BenchJson(messages, args.repeat)
+    elif args.bench == 'transport':
+        BenchTransport(messages, args.repeat)
+    elif args.bench == 'threaded':
+        BenchThreaded(messages, args.repeat)
+
+if __name__ == '__main__':
+    Main()
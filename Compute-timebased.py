@@ -5,9 +5,18 @@ from select import select
 import re, json
 from functools import reduce
 from time import sleep
+import DTCBinaryLog
+import DTCRecorder
 
 """
 Computes OHLC from realtime market data
+
+The input is either the JSON lines log of DTCClient.py or the trades file of
+a binary log (DTCClient.py --binary, LOGFILE.trades), which is read without
+any parsing, or the manifest of a rotated log (LOGFILE.manifest), of which
+only the segments between --start and --end are read. Compressed logs
+(DTCClient.py --compress) are read the same way, decompressing only the blocks
+between --start and --end.
 """
 
 def ComputeOHLC(data, datetime, price, volume):
@@ -157,16 +166,9 @@ def WriteData(compute_type, datetime, data, thefile, write_session):
 
     thefile.flush()
 
-def process(compute_type, period_in_seconds, infile, hfile, rfile, follow_mode):
-
-    assert(compute_type == 'ohlc' or compute_type == 'imbalance')
-
-    data = {}
-    last = 0
-
-    # write period in the front
-    hfile.write("%d\n" % period_in_seconds)
+def JsonTrades(infile, follow_mode):
 
+    # (datetime, price, volume, isBid) of every trade in a JSON lines log
     read_from = infile
     if follow_mode:
         read_from = follow(infile)
@@ -187,10 +189,101 @@ def process(compute_type, period_in_seconds, infile, hfile, rfile, follow_mode):
         if obj['Type'] != 112:
             continue
 
-        datetime = obj['DateTime']
-        price = obj['Price']
-        volume = obj['Volume']
-        isBid = obj['AtBidOrAsk'] == 1
+        yield obj['DateTime'], obj['Price'], obj['Volume'], obj['AtBidOrAsk'] == 1
+
+def BinaryTrades(path, follow_mode, start = None, end = None):
+
+    # (datetime, price, volume, isBid) of every trade in a binary trades log
+    if DTCBinaryLog.ReadHeader(path)['kind'] != DTCBinaryLog.TRADES:
+        raise ValueError('%s is not a trades log' % path)
+
+    if follow_mode:
+        chunks = DTCBinaryLog.Follow(path)
+    else:
+        chunks = [DTCBinaryLog.Load(path)[1]]
+
+    for records in chunks:
+        yield from RecordTrades(records, start, end)
+
+def RecordTrades(records, start, end):
+
+    if start is not None:
+        records = records[records['time'] >= start]
+    if end is not None:
+        records = records[records['time'] < end]
+    # whole columns at once, then plain python values
+    yield from zip(records['time'].tolist(), records['price'].tolist(),
+                   records['volume'].tolist(), (records['side'] == 1).tolist())
+
+def CompressedTrades(path, start, end):
+
+    # trades of a compressed JSON lines or binary trades log, only the blocks
+    # between start and end are decompressed
+    header = DTCRecorder.CompressedHeader(path)
+    blocks = DTCRecorder.ReadBlocks(path, start, end)
+
+    if header.startswith(DTCBinaryLog.MAGIC):
+        header = DTCBinaryLog.ParseHeader(header)
+        if header['kind'] != DTCBinaryLog.TRADES:
+            raise ValueError('%s is not a trades log' % path)
+        for block in blocks:
+            yield from RecordTrades(DTCBinaryLog.Records(header, block), start, end)
+        return
+
+    lines = (line for block in blocks for line in block.decode().splitlines(True))
+    yield from InRange(JsonTrades(lines, False), start, end)
+
+def FileTrades(path, start, end):
+
+    # trades of one log file, whatever its format
+    if DTCRecorder.IsCompressed(path):
+        yield from CompressedTrades(path, start, end)
+    elif DTCBinaryLog.IsBinaryLog(path):
+        yield from BinaryTrades(path, False, start, end)
+    else:
+        with open(path, 'r') as infile:
+            yield from InRange(JsonTrades(infile, False), start, end)
+
+def InRange(trades, start, end):
+
+    for trade in trades:
+        if (start is None or trade[0] >= start) and (end is None or trade[0] < end):
+            yield trade
+
+def SegmentTrades(manifest, start, end):
+
+    # trades of the segments of a rotated log between start and end, binary
+    # trades segments if there are any, else JSON lines ones
+    segments = DTCRecorder.Segments(manifest, DTCBinaryLog.TRADES, start, end)
+    if not segments:
+        segments = DTCRecorder.Segments(manifest, DTCRecorder.JSON_LINES, start, end)
+
+    for path in segments:
+        yield from FileTrades(path, start, end)
+
+def ParseTime(value):
+
+    # seconds since the epoch, or an ISO date/time in local time
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        # imported here, datetime is a variable everywhere else in this file
+        from datetime import datetime
+        return datetime.fromisoformat(value).timestamp()
+
+def process(compute_type, period_in_seconds, trades, hfile, rfile):
+
+    assert(compute_type == 'ohlc' or compute_type == 'imbalance')
+
+    data = {}
+    last = 0
+
+    # write period in the front
+    hfile.write("%d\n" % period_in_seconds)
+
+    for datetime, price, volume, isBid in trades:
 
         datetime -= datetime % period_in_seconds
 
@@ -221,6 +314,8 @@ def Main():
                                                                                  1hr, 2hr, etc""")
     parser.add_argument('--type', '-t', default='ohlc', help="output type: ohlc or imbalance")
     parser.add_argument('--follow', '-f', default=False, action='store_true', help="Do we follow the input file?")
+    parser.add_argument('--start', default=None, help="Only trades from this time on, seconds since the epoch or eg. 2021-06-01T08:30")
+    parser.add_argument('--end', default=None, help="Only trades before this time")
 
     args = parser.parse_args()
 
@@ -230,7 +325,27 @@ def Main():
         print('Unknown period')
         exit(0)
 
-    infile = open(args.input, 'r')
+    start = ParseTime(args.start)
+    end = ParseTime(args.end)
+
+    if DTCRecorder.IsManifest(args.input):
+        if args.follow:
+            print('Follow a segment of the log, not its manifest')
+            exit(-1)
+        infile = args.input
+        trades = SegmentTrades(args.input, start, end)
+    elif DTCRecorder.IsCompressed(args.input):
+        if args.follow:
+            print('A compressed log cannot be followed')
+            exit(-1)
+        infile = args.input
+        trades = CompressedTrades(args.input, start, end)
+    elif DTCBinaryLog.IsBinaryLog(args.input):
+        infile = args.input
+        trades = BinaryTrades(args.input, args.follow, start, end)
+    else:
+        infile = open(args.input, 'r')
+        trades = InRange(JsonTrades(infile, args.follow), start, end)
     hfile = open(args.historicalFile, 'w')
     rfile = open(args.realtimeFile, 'w')
 
@@ -246,7 +361,7 @@ def Main():
         print('Unable to open realtime data file: ', args.realtimeFile)
         exit(-1)
 
-    process(args.type, period_in_seconds, infile, hfile, rfile, args.follow)
+    process(args.type, period_in_seconds, trades, hfile, rfile)
 
 
 if __name__ == '__main__':
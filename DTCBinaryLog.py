@@ -0,0 +1,251 @@
+import DTCConstants as DTC
+from DTCRecorder import Manifest, MessageTime, RotatingLog, MANIFEST_SUFFIX
+import json
+import os
+import struct
+from time import sleep
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+'''
+Binary trade and depth logs.
+
+Trades and depth updates are written as fixed size little endian records, one
+file per kind (<log>.trades, <log>.depth), so a log can be mapped straight
+into a NumPy structured array instead of parsing every line:
+
+    header, trades = Load('current.log.trades')
+    trades['price'], trades['time'], ...
+
+  trades  time, price, volume, symbol_id, side (AtBidOrAsk)
+  depth   time, price, quantity, symbol_id, num_orders, level, side,
+          update_type, flags
+
+time is in seconds (float), whatever the resolution of the message; messages
+without a timestamp get their receive time. level is only known for snapshot
+levels, 0 otherwise. flags are FIRST_IN_BATCH/LAST_IN_BATCH from the batch
+fields of the message, and SNAPSHOT for snapshot levels (update_type 0).
+
+Every file starts with MAGIC, the header size (uint32) and a JSON header,
+padded to a multiple of 64 bytes, with the record's NumPy dtype description
+(names, formats, offsets, itemsize), the kind and the recorded symbols by
+SymbolID, so it can be read without this module:
+
+    np.memmap(path, np.dtype({names, formats, offsets, itemsize}), 'r', offset=size)
+
+Appending to a log recorded with other symbols is refused, SymbolIDs would not
+match.
+'''
+
+MAGIC = b'DTCBLOG\x01'
+HEADER_PREFIX = struct.Struct('<8sI')
+HEADER_ALIGN = 64
+
+TRADES = 'trades'
+DEPTH = 'depth'
+KINDS = (TRADES, DEPTH)
+
+# depth record flags
+FIRST_IN_BATCH = 1
+LAST_IN_BATCH = 2
+SNAPSHOT = 4
+
+NUMPY_FORMATS = {'d': '<f8', 'I': '<u4', 'H': '<u2', 'B': 'u1'}
+
+class RecordLayout:
+
+    def __init__(self, kind, *fields):
+        # fields are (name, struct code), in an order that needs no padding
+        self.kind = kind
+        self.names = [name for name, code in fields]
+        self.formats = [NUMPY_FORMATS[code] for name, code in fields]
+        codes = ''.join(code for name, code in fields)
+        self.offsets = [struct.calcsize('<' + codes[:i]) for i in range(len(codes))]
+        size = struct.calcsize('<' + codes)
+        self.itemsize = (size + 7) // 8 * 8
+        self.struct = struct.Struct('<%s%dx' % (codes, self.itemsize - size))
+
+    def describe(self):
+        return {
+            'names': self.names,
+            'formats': self.formats,
+            'offsets': self.offsets,
+            'itemsize': self.itemsize,
+        }
+
+TRADE_LAYOUT = RecordLayout(TRADES,
+    ('time', 'd'), ('price', 'd'), ('volume', 'd'), ('symbol_id', 'I'), ('side', 'B'))
+DEPTH_LAYOUT = RecordLayout(DEPTH,
+    ('time', 'd'), ('price', 'd'), ('quantity', 'd'), ('symbol_id', 'I'), ('num_orders', 'I'),
+    ('level', 'H'), ('side', 'B'), ('update_type', 'B'), ('flags', 'B'))
+LAYOUTS = {TRADES: TRADE_LAYOUT, DEPTH: DEPTH_LAYOUT}
+
+def Dtype(description):
+    return np.dtype({key: description[key] for key in ('names', 'formats', 'offsets', 'itemsize')})
+
+if np is not None:
+    TRADE_DTYPE = Dtype(TRADE_LAYOUT.describe())
+    DEPTH_DTYPE = Dtype(DEPTH_LAYOUT.describe())
+
+SNAPSHOT_TYPES = {DTC.MARKET_DEPTH_SNAPSHOT_LEVEL, DTC.MARKET_DEPTH_SNAPSHOT_LEVEL_FLOAT}
+
+def _Trade(message, timestamp):
+    return TRADE_LAYOUT.struct.pack(
+        timestamp, message.get('Price', 0.0), message.get('Volume', 0.0),
+        message.get('SymbolID', 0), message.get('AtBidOrAsk', 0))
+
+def _Depth(message, timestamp):
+    flags = 0
+    final = message.get('FinalUpdateInBatch')
+    if message.get('IsFirstMessageInBatch') or final == DTC.FINAL_UPDATE_BEGIN_BATCH:
+        flags |= FIRST_IN_BATCH
+    if message.get('IsLastMessageInBatch') or final == DTC.FINAL_UPDATE_TRUE:
+        flags |= LAST_IN_BATCH
+    if message['Type'] in SNAPSHOT_TYPES:
+        flags |= SNAPSHOT
+    return DEPTH_LAYOUT.struct.pack(
+        timestamp, message.get('Price', 0.0), message.get('Quantity', 0.0),
+        message.get('SymbolID', 0), message.get('NumOrders', 0), message.get('Level', 0),
+        message.get('Side', 0), message.get('UpdateType', 0), flags)
+
+# type -> (kind, record packer); the _INT types need the symbol's price
+# divisor and are not recorded
+RECORDS = {
+    DTC.MARKET_DATA_UPDATE_TRADE: (TRADES, _Trade),
+    DTC.MARKET_DATA_UPDATE_TRADE_COMPACT: (TRADES, _Trade),
+    DTC.MARKET_DATA_UPDATE_TRADE_WITH_UNBUNDLED_INDICATOR: (TRADES, _Trade),
+    DTC.MARKET_DATA_UPDATE_TRADE_WITH_UNBUNDLED_INDICATOR_2: (TRADES, _Trade),
+    DTC.MARKET_DATA_UPDATE_TRADE_NO_TIMESTAMP: (TRADES, _Trade),
+    DTC.MARKET_DEPTH_UPDATE_LEVEL: (DEPTH, _Depth),
+    DTC.MARKET_DEPTH_UPDATE_LEVEL_FLOAT_WITH_MILLISECONDS: (DEPTH, _Depth),
+    DTC.MARKET_DEPTH_UPDATE_LEVEL_NO_TIMESTAMP: (DEPTH, _Depth),
+    DTC.MARKET_DEPTH_SNAPSHOT_LEVEL: (DEPTH, _Depth),
+    DTC.MARKET_DEPTH_SNAPSHOT_LEVEL_FLOAT: (DEPTH, _Depth),
+}
+
+def LogPath(path, kind):
+    return '%s.%s' % (path, kind)
+
+def Header(layout, symbols = None):
+    # symbols: {SymbolID: symbol}
+    description = layout.describe()
+    description['kind'] = layout.kind
+    description['version'] = 1
+    description['symbols'] = {str(k): v for k, v in sorted((symbols or {}).items())}
+    text = json.dumps(description).encode()
+    size = HEADER_PREFIX.size + len(text)
+    size = (size + HEADER_ALIGN - 1) // HEADER_ALIGN * HEADER_ALIGN
+    return HEADER_PREFIX.pack(MAGIC, size) + text.ljust(size - HEADER_PREFIX.size)
+
+def IsBinaryLog(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def ParseHeader(data):
+    # the header dict, with the header's 'size' in bytes
+    magic, size = HEADER_PREFIX.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a binary DTC log")
+    header = json.loads(data[HEADER_PREFIX.size : size])
+    header['size'] = size
+    return header
+
+def ReadHeader(path):
+    with open(path, 'rb') as f:
+        data = f.read(HEADER_PREFIX.size)
+        if len(data) == HEADER_PREFIX.size:
+            data += f.read(HEADER_PREFIX.unpack(data)[1] - HEADER_PREFIX.size)
+    try:
+        return ParseHeader(data)
+    except (ValueError, struct.error):
+        raise ValueError("%s is not a binary DTC log" % path)
+
+def Records(header, data):
+    # records in a bytes-like data, eg. a decompressed block
+    return np.frombuffer(data, Dtype(header))
+
+def Load(path):
+    # (header, records), records mapped read only; a record cut short by a
+    # crash is left out
+    header = ReadHeader(path)
+    dtype = Dtype(header)
+    count = (os.path.getsize(path) - header['size']) // dtype.itemsize
+    if count <= 0:
+        return header, np.zeros(0, dtype)
+    return header, np.memmap(path, dtype, 'r', offset=header['size'], shape=(count,))
+
+def Follow(path, wait_time = 60 * 16, chunk_size = 1 << 20):
+    # records of a log that is still being written, as arrays of whatever has
+    # been added since; ends after wait_time seconds without new records
+    header = ReadHeader(path)
+    dtype = Dtype(header)
+    wait = wait_time
+    pending = b''
+    with open(path, 'rb') as f:
+        f.seek(header['size'])
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                if wait <= 0:
+                    return
+                wait -= 0.5
+                sleep(0.5)
+                continue
+            wait = wait_time
+            pending += data
+            whole = len(pending) - len(pending) % dtype.itemsize
+            if whole:
+                yield np.frombuffer(pending[:whole], dtype)
+                pending = pending[whole:]
+
+
+class BinaryLogWriter:
+
+    def __init__(self, path, symbols = None, append = False, **log_kwargs):
+        # symbols: {SymbolID: symbol}; log_kwargs (rotation, GroupCommitWriter
+        # options) go to each kind's RotatingLog, rotated logs share one
+        # manifest
+        symbols = symbols or {}
+        manifest = None
+        if log_kwargs.get('rotation') is not None:
+            manifest = Manifest(path + MANIFEST_SUFFIX)
+        self.logs = {}
+        for kind, layout in LAYOUTS.items():
+            self.logs[kind] = RotatingLog(
+                LogPath(path, kind), kind, Header(layout, symbols), append, manifest=manifest,
+                symbols=list(symbols.values()), **log_kwargs)
+
+    @staticmethod
+    def types():
+        # the message types that are recorded, eg. for accept_types
+        return list(RECORDS)
+
+    async def write(self, message, received_at):
+        spec = RECORDS.get(message['Type'])
+        if spec is None:
+            return
+        kind, pack = spec
+        timestamp = MessageTime(message, received_at)
+        await self.logs[kind].write(pack(message, timestamp), timestamp)
+
+    async def write_many(self, messages, received_at):
+        records = {kind: [] for kind in KINDS}
+        times = {kind: [] for kind in KINDS}
+        for message in messages:
+            spec = RECORDS.get(message['Type'])
+            if spec is None:
+                continue
+            kind, pack = spec
+            timestamp = MessageTime(message, received_at)
+            records[kind].append(pack(message, timestamp))
+            times[kind].append(timestamp)
+        for kind, items in records.items():
+            if items:
+                await self.logs[kind].write_many(items, min(times[kind]), max(times[kind]))
+
+    async def close(self):
+        for log in self.logs.values():
+            await log.close()
@@ -1,93 +1,166 @@
 
-import DTCProtocol_pb2 as DTC
+import DTCConstants as DTC
+from DTCDispatcher import Dispatcher
+from DTCQueue import MessageQueue, AsyncMessageQueue, ConflatingDepthChannel, BLOCK, END
+from DTCSubscriptions import SubscriptionManager
+from DTCEncoding import CreateCodec, EncodingRequest, ParseEncodingResponse, FrameBuffer, JSON
+from DTCTransport import FrameProtocol, PROTOCOL, TRANSPORTS, UseUvloop
+from DTCMonitor import LinkMonitor
+from DTCLatency import LatencyRecorder
+from DTCRecorder import RotatingLog, RawHeader, RawRecord, MessageTime, DURABILITY, OS, ROTATIONS, COMPRESSIONS, JSON_LINES, RAW
 import socket
 import struct
-import json
 from threading import Thread, Timer, Lock
-from queue import Queue
 import time
 from datetime import datetime
 from termcolor import colored
 import colorama
 import  asyncio as aio
-import aiofiles
 import argparse
+import signal
+
+# requests replayed after a reconnect
+SUBSCRIPTION_TYPES = {
+    DTC.MARKET_DATA_REQUEST,
+    DTC.MARKET_DEPTH_REQUEST,
+}
+
+# trades with a DateTime, the start of a backfill
+BACKFILL_TRADE_TYPES = {
+    DTC.MARKET_DATA_UPDATE_TRADE,
+    DTC.MARKET_DATA_UPDATE_TRADE_COMPACT,
+}
+
+# the historical data server's answers to a HISTORICAL_PRICE_DATA_REQUEST
+HISTORY_RESPONSE_TYPES = {
+    DTC.HISTORICAL_PRICE_DATA_RESPONSE_HEADER,
+    DTC.HISTORICAL_PRICE_DATA_REJECT,
+    DTC.HISTORICAL_PRICE_DATA_RECORD_RESPONSE,
+}
+
 colorama.init()
 
-class DTCClient:
+class DTCClientBase:
+
+    def set_type_filter(self, accept_types = None, drop_types = ()):
+        # Frames are filtered on their type before being decoded. accept_types
+        # of None accepts everything that is not dropped.
+        self.accept_types = None if accept_types is None else set(accept_types)
+        self.drop_types = set(drop_types)
+        if self.ignore_heartbeat:
+            self.drop_types.add(DTC.HEARTBEAT)
+
+    def _wanted(self, frame):
+        _type = self.codec.message_type(frame)
+        if _type == DTC.HEARTBEAT:
+            # seen by the monitor even when heartbeats are ignored
+            self.monitor.heartbeat(self.codec.decode(frame))
+        if _type in self.drop_types:
+            return False
+        return self.accept_types is None or _type is None or _type in self.accept_types
+
+    def on(self, _type, handler, symbol_id = None):
+        # handler(message) is called for every message of _type (and SymbolID)
+        # once dispatching; see run() / dispatch()
+        self.dispatcher.register(_type, handler, symbol_id)
+        if self.accept_types is not None:
+            self.accept_types.add(_type)
+
+    def _dispatch_only(self):
+        # only registered types get decoded at all
+        self.set_type_filter(self.dispatcher.types(), self.drop_types)
+
+
+class DTCClient(DTCClientBase):
 
     HEARTBEAT_INTERNAL = 10
 
-    def __init__(self, ignore_heartbeat = True):
+    def __init__(self, ignore_heartbeat = True, encoding = DTC.JSON_ENCODING,
+                 accept_types = None, drop_types = (), queue_size = 4096, overflow = BLOCK, stale_after = None,
+                 latency = False, direct = False, batch = False):
         self.ip_addr = None
         self.port = None
+        self.codec = CreateCodec(encoding)
         self.lock = Lock()
-        self.msg_q = Queue(4096)
-        self.json_q = Queue(4096)
+        # see DTCQueue for the overflow policies and drop/conflation counters
+        self.json_q = MessageQueue(queue_size, overflow)
         self.receiver_thread = None
-        self.message_thread = None
         self.heartbeat_timer = None
         self.ignore_heartbeat = ignore_heartbeat
+        # round trip, clock offset and staleness, see DTCMonitor
+        self.monitor = LinkMonitor(stale_after)
+        # exchange to receive latency histograms, see DTCLatency
+        self.latency = LatencyRecorder() if latency else None
+        # With direct there is no receiver thread and no queue, run() receives,
+        # decodes and calls the handler in the calling thread. With batch the
+        # queue and handlers get the list of messages from each read.
+        self.direct = direct
+        self.batch = batch
+        self.dispatcher = Dispatcher()
+        self.set_type_filter(accept_types, drop_types)
 
     def send_json_request(self, json_obj):
-        req = json.dumps(json_obj).encode("ascii");
+        req = self.codec.encode(json_obj)
+        self.lock.acquire()
+        self.sock.sendall(req)
+        self.lock.release()
+        self.monitor.sent()
+
+    def send_many(self, requests):
+        # all requests in one sendall
+        req = b''.join(self.codec.encode(json_obj) for json_obj in requests)
         self.lock.acquire()
-        self.sock.sendall(req + b"\x00")
+        self.sock.sendall(req)
         self.lock.release()
+        self.monitor.sent()
 
     def receiver(self):
         try:
-            while True:
-                msg = self.sock.recv(4096)
-                if len(msg) == 0:
-                    print(colored("Receiver handler done", 'green'));
-                    break
-                self.msg_q.put(msg)
+            for batch in self._read():
+                if self.batch:
+                    self.json_q.put(batch)
+                else:
+                    for msg in batch:
+                        self.json_q.put(msg)
         except Exception as err:
             print(colored("Receiver handler failed - %s" % repr(err), 'red'));
+        self.json_q.put(END)
 
-        # final signal for message handler to exit
-        self.msg_q.put(b'')
-
-    def message_to_json(self):
-
-        msg = b''
-
+    def _read(self):
+        # Receives straight into a preallocated buffer and decodes every
+        # complete frame from views into it, no per frame copies. Yields the
+        # messages of each read until the connection ends.
+        frames = FrameBuffer(self.codec)
         while True:
-
-            msg += self.msg_q.get()
-
-            if msg == b'':
-                break
-
-            while True:
-                index = msg.find(b'\x00')
-                if index != -1:
-                    obj = json.loads(msg[0 : index].decode(encoding = 'ascii'))
-                    if self.ignore_heartbeat and obj['Type'] == 3:
-                        pass
-                    else:
-                        self.json_q.put(obj);
-                    msg = msg[index + 1:]
-                else:
-                    break
-
-        print(colored("Message handler done", 'green'));
+            if frames.recv_into(self.sock) == 0:
+                print(colored("Receiver handler done", 'green'));
+                return
+            self.monitor.received()
+            batch = []
+            for frame in frames.frames():
+                if self._wanted(frame):
+                    msg = self.codec.decode(frame)
+                    if self.latency is not None:
+                        self.latency.record(msg, self.monitor.received_at)
+                    batch.append(msg)
+            if batch:
+                yield batch
 
     def recv_json_response(self):
-        msg = '';
+        msg = b'';
         while True:
             c = self.sock.recv(1);
+            msg += c
             if c == b'\x00':
                 break;
-            msg += c.decode(encoding="ascii");
-        return json.loads(msg);
+        return self.codec.decode(msg);
 
     def _heartbeat(self):
         try:
             while True:
-                time.sleep(10)
-                self.send_json_request({ "Type": DTC.HEARTBEAT });
+                time.sleep(self.monitor.CHECK_INTERVAL)
+                if self.monitor.check(self.sock, self.HEARTBEAT_INTERNAL):
+                    self.send_json_request({ "Type": DTC.HEARTBEAT });
         except Exception as err:
             print(colored("Heartbeat failed - %s" % repr(err), 'red'));
 
@@ -96,6 +169,18 @@ class DTCClient:
         self.ip_addr = ip_addr
         self.port = port
         self.sock = socket.create_connection((ip_addr, port))
+        self.set_encoding(self.codec.ENCODING)
+
+    def set_encoding(self, encoding):
+        self.sock.sendall(EncodingRequest(encoding))
+        res = b''
+        while len(res) < 16:
+            chunk = self.sock.recv(16 - len(res))
+            if len(chunk) == 0:
+                raise ConnectionError("Connection closed during encoding negotiation")
+            res += chunk
+        if ParseEncodingResponse(res) != encoding:
+            raise RuntimeError("Server refused encoding %d" % encoding)
 
 
     def logon(self, username, password, name = "hello"):
@@ -114,100 +199,427 @@ class DTCClient:
         self.heartbeat_timer = Thread(target=self._heartbeat, daemon = True)
         self.heartbeat_timer.start()
 
-        self.receiver_thread = Thread(target=self.receiver, daemon = True)
-        self.receiver_thread.start()
-
-        self.message_thread = Thread(target=self.message_to_json, daemon = True)
-        self.message_thread.start()
+        # in direct mode run() is the receiver
+        if not self.direct:
+            self.receiver_thread = Thread(target=self.receiver, daemon = True)
+            self.receiver_thread.start()
 
     def close(self):
 
         if self.sock:
             self.sock.close()
 
-    def run(self, handler):
+    def run(self, handler = None):
+
+        # Calls handler(message), or handler(messages) in batch mode, until the
+        # connection ends. Without a handler messages go to the handlers
+        # registered with on().
+        if handler is None:
+            self._dispatch_only()
+            handler = self.dispatcher.dispatch_many if self.batch else self.dispatcher.dispatch
+
+        if self.direct:
+            for batch in self._read():
+                if self.batch:
+                    handler(batch)
+                else:
+                    for msg in batch:
+                        handler(msg)
+            return
 
         while True:
             res = self.json_q.get()
+            if res == END:
+                return
             handler(res)
 
 
-class DTCClientAsync:
+class DTCClientAsync(DTCClientBase):
 
     HEARTBEAT_INTERNAL = 10
 
-    def __init__(self, decode_message=True, ignore_heartbeat=True):
+    READ_SIZE = 1 << 16
+
+    # reconnect backoff, doubled after every failed attempt
+    RECONNECT_MIN_DELAY = 1
+    RECONNECT_MAX_DELAY = 60
+    # seconds to wait for the trades of one symbol from the historical server
+    BACKFILL_TIMEOUT = 30
+
+    def __init__(self, decode_message=True, ignore_heartbeat=True, encoding=DTC.JSON_ENCODING, batch=False,
+                 accept_types=None, drop_types=(), queue_size=0, overflow=BLOCK, conflate_depth=False,
+                 reconnect=False, backfill=None, transport=PROTOCOL, stale_after=None, latency=False,
+                 coalesce=True, raw_record=None):
+        if transport not in TRANSPORTS:
+            raise ValueError("Unknown transport: %s" % transport)
+        self.transport = transport
+        # the FrameProtocol of the protocol transport, see DTCTransport.py
+        self.protocol = None
         self.ip_addr = None
         self.port = None
-        self.queue = aio.Queue()
+        self.credentials = None
+        # With reconnect a dropped connection is re-established (with backoff)
+        # instead of ending the stream, and the subscriptions are replayed.
+        # backfill is the (address, port) of a historical data server to fetch
+        # the trades missed meanwhile from, see _backfill().
+        self.reconnect = reconnect
+        self.backfill = backfill
+        self.closing = False
+        # With coalesce, requests sent within one loop iteration are written
+        # together once the iteration is over, see _flush().
+        self.coalesce = coalesce
+        self.pending_writes = []
+        self.flush_handle = None
+        # resolved by _flush() once the pending writes are written
+        self.flushed = None
+        self.reconnecting = False
+        # (Type, SymbolID) -> the last subscribe request, replayed on reconnect
+        self.requested = {}
+        # SymbolID -> (Type, DateTime) of the last trade, for backfill
+        self.last_trades = {}
+        self.codec = CreateCodec(encoding)
+        # see DTCQueue for the overflow policies and drop/conflation counters
+        self.queue = AsyncMessageQueue(queue_size, overflow)
+        # with conflate_depth depth messages bypass the queue, see depth_updates()
+        self.depth_channel = ConflatingDepthChannel() if conflate_depth and decode_message else None
+        self.subscriptions = SubscriptionManager(self)
         self.sock_reader = None
         self.sock_writter = None
         self.heartbeat_task = None
         self.ignore_heartbeat = ignore_heartbeat if decode_message else False
+        # round trip, clock offset and staleness, see DTCMonitor
+        self.monitor = LinkMonitor(stale_after)
+        # exchange to receive latency histograms of decoded messages, see DTCLatency
+        self.latency = LatencyRecorder() if latency and decode_message else None
         self.decode_message = decode_message
+        # in batch mode the queue holds lists of messages instead of messages
+        self.batch = batch
+        # without decode_message, raw_record(received_at, frame) makes what is
+        # queued for each frame, eg. DTCRecorder.RawRecord; the default is the
+        # frame itself
+        self.raw_record = raw_record
+        self.dispatcher = Dispatcher()
+        self.set_type_filter(accept_types, drop_types)
 
     async def send_json_request(self, json_obj):
-        req = json.dumps(json_obj).encode("ascii");
-        self.sock_writter.write(req + b"\x00")
+        # requests are dicts, sent in whatever encoding has been negotiated
+        if json_obj['Type'] in SUBSCRIPTION_TYPES:
+            self._track(json_obj)
+        if self.coalesce:
+            self.pending_writes.append(self.codec.encode(json_obj))
+            if self.flush_handle is None:
+                loop = aio.get_running_loop()
+                self.flush_handle = loop.call_soon(self._flush)
+                self.flushed = loop.create_future()
+            # drain once the request has been written, shielded as the future
+            # is shared by every request of the write
+            await aio.shield(self.flushed)
+        else:
+            self.sock_writter.write(self.codec.encode(json_obj))
+        await self.sock_writter.drain()
+        self.monitor.sent()
+
+    async def send_many(self, requests):
+        # all requests in one write
+        for json_obj in requests:
+            if json_obj['Type'] in SUBSCRIPTION_TYPES:
+                self._track(json_obj)
+        self._flush()
+        self.sock_writter.write(b''.join(self.codec.encode(json_obj) for json_obj in requests))
         await self.sock_writter.drain()
+        self.monitor.sent()
+
+    def _flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        flushed, self.flushed = self.flushed, None
+        try:
+            if self.pending_writes:
+                data = b''.join(self.pending_writes)
+                self.pending_writes = []
+                self.sock_writter.write(data)
+        finally:
+            if flushed is not None and not flushed.done():
+                flushed.set_result(None)
+
+    def _track(self, req):
+        key = (req['Type'], req.get('SymbolID'))
+        if req.get('RequestAction', DTC.SUBSCRIBE) == DTC.UNSUBSCRIBE:
+            self.requested.pop(key, None)
+        else:
+            self.requested[key] = req
 
     async def receiver(self):
 
         try:
             while True:
-                msg = await self.sock_reader.readuntil(b'\x00')
-                if len(msg) == 0:
-                    print(colored("Receiver handler done", 'green'));
+                try:
+                    if self.protocol is not None:
+                        await self._receive_protocol()
+                    elif self.batch:
+                        await self._receive_batches()
+                    else:
+                        await self._receive_messages()
+                except Exception as err:
+                    #print(colored("Receiver handler failed - %s" % repr(err), 'red'));
+                    pass
+
+                if not self.reconnect or self.closing or not await self._reconnect():
                     break
-                assert(msg[-1] == 0)
-                if self.decode_message:
-                    obj = json.loads(msg[:-1].decode(encoding='ascii'))
-                    if self.ignore_heartbeat and obj['Type'] == 3:
-                        continue
-                    await self.queue.put(obj)
-                else:
-                    await self.queue.put(msg)
-        except Exception as err:
-            #print(colored("Receiver handler failed - %s" % repr(err), 'red'));
-            pass
 
-        await self.queue.put(b'')
-        print(colored("Receiver exiting", 'red'));
+            await self.queue.put(b'')
+        finally:
+            # also when close() cancels the receiver, so no subscriber waits
+            # for messages that will never come
+            if self.depth_channel is not None:
+                self.depth_channel.close()
+            self.subscriptions.close()
+            print(colored("Receiver exiting", 'red'));
+
+    async def _receive_messages(self):
+        while True:
+            msg = await self.codec.read_frame(self.sock_reader)
+            if len(msg) == 0:
+                print(colored("Receiver handler done", 'green'));
+                return
+            self.monitor.received()
+            if not self._wanted(msg):
+                continue
+            if self.decode_message:
+                obj = self.codec.decode(msg)
+                if self._route(obj):
+                    continue
+                await self.queue.put(obj)
+            elif self.raw_record is not None:
+                await self.queue.put(self.raw_record(self.monitor.received_at, msg))
+            else:
+                await self.queue.put(msg)
+
+    def _route(self, obj, live = True):
+        # True if the message was taken by the depth channel or a subscription;
+        # backfilled trades (live False) were not just received, no latency
+        if live and self.latency is not None:
+            self.latency.record(obj, self.monitor.received_at)
+        if self.backfill is not None and obj['Type'] in BACKFILL_TRADE_TYPES:
+            self.last_trades[obj.get('SymbolID')] = (obj['Type'], obj['DateTime'])
+        if self.depth_channel is not None and self.depth_channel.put(obj):
+            return True
+        return self.subscriptions.active > 0 and self.subscriptions.route(obj)
+
+    async def _receive_batches(self):
+        # parse everything the stream has buffered and queue it as one list
+        frames = FrameBuffer(self.codec)
+        while True:
+            data = await self.sock_reader.read(self.READ_SIZE)
+            if len(data) == 0:
+                print(colored("Receiver handler done", 'green'));
+                return
+            self.monitor.received()
+            frames.feed(data)
+            batch = self._collect(frames.frames())
+            if batch:
+                await self.queue.put(batch)
+
+    def _collect(self, frames):
+        batch = []
+        raw_record = self.raw_record
+        received_at = self.monitor.received_at
+        for frame in frames:
+            if not self._wanted(frame):
+                continue
+            if self.decode_message:
+                obj = self.codec.decode(frame)
+                if self._route(obj):
+                    continue
+                batch.append(obj)
+            elif raw_record is not None:
+                batch.append(raw_record(received_at, frame))
+            else:
+                # frames are views into a reused buffer
+                batch.append(bytes(frame))
+        return batch
+
+    async def _receive_protocol(self):
+        # frames are handled by _frames_received as they arrive
+        await self.protocol.wait_closed()
+        print(colored("Receiver handler done", 'green'));
+
+    def _frames_received(self, frames):
+        self.monitor.received()
+        items = self._collect(frames)
+        if self.batch:
+            items = [items] if items else []
+        for i, item in enumerate(items):
+            try:
+                self.queue.put_nowait(item)
+            except aio.QueueFull:
+                # stop reading until the consumer has made room
+                self.protocol.pause_reading()
+                aio.get_running_loop().create_task(self._put_blocked(self.protocol, items[i:]))
+                return
+
+    async def _put_blocked(self, protocol, items):
+        for item in items:
+            await self.queue.put(item)
+        protocol.resume_reading()
 
     async def _heartbeat(self):
-        try:
-            while True:
-                await aio.sleep(self.HEARTBEAT_INTERNAL)
+        while True:
+            await aio.sleep(self.monitor.CHECK_INTERVAL)
+            due = self.monitor.check(self.sock_writter.get_extra_info('socket'), self.HEARTBEAT_INTERNAL)
+            if not due or self.reconnecting:
+                continue
+            try:
                 await self.send_json_request({ "Type": DTC.HEARTBEAT });
-        except Exception as err:
-            #print(colored("Heartbeat failed - %s" % repr(err), 'red'));
-            pass
+            except Exception as err:
+                #print(colored("Heartbeat failed - %s" % repr(err), 'red'));
+                # keep going while the receiver reconnects
+                if not self.reconnect:
+                    return
+
+    async def _reconnect(self):
+        # returns True once connected, logged on and resubscribed again
+        delay = self.RECONNECT_MIN_DELAY
+        self.reconnecting = True
+        while not self.closing:
+            print(colored("Connection lost, reconnecting in %gs" % delay, 'yellow'))
+            await aio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+            try:
+                if self.sock_writter:
+                    self.sock_writter.close()
+                await self.connect(self.ip_addr, self.port)
+                # what the live feed sends from here on is not backfilled
+                until = self.monitor.server_time()
+                await self.send_many([self._logon_request(*self.credentials)] + list(self.requested.values()))
+            except Exception as err:
+                print(colored("Reconnect failed - %s" % repr(err), 'red'))
+                continue
+
+            print(colored("Reconnected to %s:%d" % (self.ip_addr, self.port), 'green'))
+            self.reconnecting = False
+            if self.backfill is not None:
+                try:
+                    await self._backfill(until)
+                except Exception as err:
+                    print(colored("Backfill failed - %s" % repr(err), 'red'))
+                finally:
+                    # the live feed was held back by connect()
+                    if self.protocol is not None:
+                        self.protocol.release()
+            return True
+        self.reconnecting = False
+        return False
+
+    async def _backfill(self, until):
+        # Requests the trades since the last one received, per market data
+        # subscription, from the historical data server and queues them as
+        # trade messages of the same type, before anything received on the new
+        # connection. Records at or before the last trade's DateTime are
+        # skipped, so trades sharing its second may be missing, as are records
+        # from the second of until (the server time the subscriptions were
+        # replayed at) on, which the live feed sends again.
+        history = DTCClientAsync(encoding=DTC.JSON_ENCODING)
+        await history.connect(*self.backfill)
+        trades = []
+        try:
+            await history.logon(*self.credentials)
+            until = int(until)
+            for (_type, symbol_id), req in list(self.requested.items()):
+                if _type != DTC.MARKET_DATA_REQUEST or symbol_id not in self.last_trades:
+                    continue
+                try:
+                    trades += await aio.wait_for(self._backfill_symbol(history, symbol_id, req, until),
+                                                 self.BACKFILL_TIMEOUT)
+                except aio.TimeoutError:
+                    print(colored("Backfill of %s timed out" % req['Symbol'], 'red'))
+        finally:
+            await history.close()
+
+        print(colored("Backfilled %d trades" % len(trades), 'green'))
+        trades = [trade for trade in trades if not self._route(trade, False)]
+        if trades and self.batch:
+            await self.queue.put(trades)
+        elif trades:
+            for trade in trades:
+                await self.queue.put(trade)
+
+    async def _backfill_symbol(self, history, symbol_id, req, until):
+        trade_type, last = self.last_trades[symbol_id]
+        await history.send_json_request({
+            'Type': DTC.HISTORICAL_PRICE_DATA_REQUEST,
+            'RequestID': symbol_id,
+            'Symbol': req['Symbol'],
+            'Exchange': req.get('Exchange', ''),
+            'RecordInterval': DTC.INTERVAL_TICK,
+            'StartDateTime': int(last),
+            'EndDateTime': until,
+            'MaxDaysToReturn': 0,
+            'UseZLibCompression': 0
+        })
+        trades = []
+        async for record in history.messages():
+            if record['Type'] not in HISTORY_RESPONSE_TYPES or record.get('RequestID') != symbol_id:
+                # eg. what is left of an earlier request that timed out
+                continue
+            if record['Type'] == DTC.HISTORICAL_PRICE_DATA_REJECT:
+                print(colored("Backfill of %s rejected" % req['Symbol'], 'red'))
+                break
+            if record['Type'] == DTC.HISTORICAL_PRICE_DATA_RESPONSE_HEADER:
+                # nothing was missed, no records follow
+                if record.get('NoRecordsToReturn'):
+                    break
+                continue
+            if record.get('IsFinalRecord'):
+                break
+            if record['StartDateTime'] <= last or record['StartDateTime'] >= until:
+                continue
+            trades.append({
+                'Type': trade_type,
+                'SymbolID': symbol_id,
+                'AtBidOrAsk': DTC.AT_ASK if record.get('AskVolume', 0) > 0 else DTC.AT_BID,
+                'Price': record['LastPrice'],
+                'Volume': record['Volume'],
+                'DateTime': record['StartDateTime']
+            })
+        return trades
+
+    async def set_encoding(self, encoding):
+        self.sock_writter.write(EncodingRequest(encoding))
+        await self.sock_writter.drain()
+        if self.protocol is not None:
+            res = await self.protocol.encoding_response()
+        else:
+            res = await self.sock_reader.readexactly(16)
+        if ParseEncodingResponse(res) != encoding:
+            raise RuntimeError("Server refused encoding %d" % encoding)
 
     async def set_encoding_to_json(self):
-        _type = DTC.ENCODING_REQUEST.to_bytes(2, byteorder='little', signed=True)
-        pv = DTC.CURRENT_VERSION.to_bytes(4, byteorder='little', signed=True)
-        encoding = DTC.JSON_ENCODING.to_bytes(4, byteorder='little', signed=True)
-        pt = b'DTC\x00'
-        size = 2 + len(_type) + len(pv) + len(encoding) + len(pt)
-        assert(size == 16)
-        size = size.to_bytes(2, byteorder='little', signed=True)
-
-        req = size + _type + pv + encoding + pt
-        self.sock_writter.write(req)
-        await self.sock_writter.drain()
-        res = await self.sock_reader.read(16)
-        assert(res == b'\x10\x00\x07\x00\x08\x00\x00\x00\x02\x00\x00\x00DTC\x00')
+        await self.set_encoding(DTC.JSON_ENCODING)
 
     async def connect(self, ip_addr, port):
 
         self.ip_addr = ip_addr
         self.port = port
-        self.sock_reader, self.sock_writter = await aio.open_connection(ip_addr, port)
-        await self.set_encoding_to_json()
-
-
-    async def logon(self, username, password, name = "hello"):
-        req = {
+        # nothing queued for an earlier connection is sent on this one
+        self.pending_writes = []
+        self._flush()
+        if self.transport == PROTOCOL:
+            loop = aio.get_running_loop()
+            _, self.protocol = await loop.create_connection(
+                lambda: FrameProtocol(self.codec, self._frames_received, self.READ_SIZE), ip_addr, port)
+            self.sock_writter = self.protocol
+            if self.reconnecting and self.backfill is not None:
+                # the live data waits until the backfill is queued
+                self.protocol.hold()
+        else:
+            self.sock_reader, self.sock_writter = await aio.open_connection(ip_addr, port)
+        await self.set_encoding(self.codec.ENCODING)
+
+
+    def _logon_request(self, username, password, name):
+        return {
             "Type": DTC.LOGON_REQUEST,
             "ProtocolVersion": DTC.CURRENT_VERSION,
             "Username": username,
@@ -216,7 +628,10 @@ class DTCClientAsync:
             "ClientName": name
         }
 
-        await self.send_json_request(req);
+    async def logon(self, username, password, name = "hello"):
+        # kept to log on again after a reconnect
+        self.credentials = (username, password, name)
+        await self.send_json_request(self._logon_request(username, password, name));
 
         # start heartbeat after logon has been sent
         loop = aio.get_event_loop()
@@ -224,6 +639,9 @@ class DTCClientAsync:
         self.receiver_task = loop.create_task(self.receiver())
 
     async def close(self):
+        self.closing = True
+        if self.sock_writter:
+            self._flush()
         try:
             if not self.heartbeat_task.done():
                 self.heartbeat_task.cancel()
@@ -249,7 +667,82 @@ class DTCClientAsync:
             res = await self.queue.get()
             if res == b'':
                 return
-            yield res
+            if self.batch:
+                for msg in res:
+                    yield msg
+            else:
+                yield res
+
+    async def messages_batch(self, max_items=1024, max_wait=0):
+        # Yields lists of up to max_items messages. Once a batch has its first
+        # message, waits at most max_wait seconds for the queue to fill it up.
+        loop = aio.get_event_loop()
+        pending = []
+        done = False
+
+        while True:
+            if not pending:
+                if done:
+                    return
+                res = await self.queue.get()
+                if res == b'':
+                    return
+                self._extend(pending, res)
+
+            deadline = loop.time() + max_wait
+            while not done and len(pending) < max_items:
+                if not self.queue.empty():
+                    res = self.queue.get_nowait()
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        res = await aio.wait_for(self.queue.get(), timeout)
+                    except aio.TimeoutError:
+                        break
+                if res == b'':
+                    done = True
+                else:
+                    self._extend(pending, res)
+
+            yield pending[:max_items]
+            del pending[:max_items]
+
+    async def subscribe(self, symbol, exchange, market_data=True, depth_levels=0, **kwargs):
+        # allocates a SymbolID and subscribes, see SubscriptionManager.subscribe()
+        return await self.subscriptions.subscribe(symbol, exchange, market_data, depth_levels, **kwargs)
+
+    async def unsubscribe(self, symbol, exchange):
+        await self.subscriptions.unsubscribe(symbol, exchange)
+
+    async def depth_updates(self):
+        # with conflate_depth, yields the merged depth messages received since
+        # the previous iteration, always on batch boundaries
+        while True:
+            updates = await self.depth_channel.get()
+            if not updates:
+                return
+            yield updates
+
+    async def dispatch(self):
+        # feeds the handlers registered with on() until the connection ends
+        assert(self.decode_message)
+        self._dispatch_only()
+        while True:
+            res = await self.queue.get()
+            if res == b'':
+                return
+            if self.batch:
+                self.dispatcher.dispatch_many(res)
+            else:
+                self.dispatcher.dispatch(res)
+
+    def _extend(self, pending, res):
+        if self.batch:
+            pending.extend(res)
+        else:
+            pending.append(res)
 
 
 async def main():
@@ -257,50 +750,135 @@ async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--address', "-a", default="192.168.122.142", help="IP Address of Sierra Chart instance")
     parser.add_argument('--port', "-p", type=int, default=11199, help="Port number of Sierra Chart instance")
-    parser.add_argument('--symbol', "-s", required=True, help="Symbol Name")
+    parser.add_argument('--symbol', "-s", required=True, nargs='+', help="Symbol Name(s)")
     parser.add_argument('--exchange', "-e", default="CME", help="Exchange Name")
     parser.add_argument('--logFile', "-f", default='async-client.log', help="Output file name")
     parser.add_argument('--append', default=False, action='store_true', help="Do we append to output file?")
+    parser.add_argument('--flushBytes', type=int, default=None, help="Write to the log once this many bytes are buffered, 64KB; the block size with --compress, 1MB")
+    parser.add_argument('--flushDelay', type=float, default=None, help="or this many seconds after the first buffered message, 0.05; 1 with --compress")
+    parser.add_argument('--durability', default=OS, choices=DURABILITY, help="os: written to the OS, fsync: also synced to disk, on every write")
+    parser.add_argument('--encoding', default='json', choices=['json', 'json-compact', 'binary', 'protobuf'], help="Wire encoding to negotiate")
+    parser.add_argument('--reconnect', default=False, action='store_true', help="Reconnect and resubscribe when the connection drops")
+    parser.add_argument('--backfill', default=None, help="ADDRESS:PORT of the historical data server to backfill missed trades from (implies --reconnect)")
+    parser.add_argument('--transport', default=PROTOCOL, choices=TRANSPORTS, help="asyncio protocol or streams based receiver")
+    parser.add_argument('--staleAfter', type=float, default=None, help="Warn when nothing has been received for this many seconds")
+    parser.add_argument('--latency', type=float, default=None, help="Print latency histograms every this many seconds")
+    parser.add_argument('--raw', default=False, action='store_true', help="Log the frames as received, without decoding (see DTCRecorder.py decode)")
+    parser.add_argument('--binary', default=False, action='store_true', help="Log trades and depth as fixed size records to LOGFILE.trades and LOGFILE.depth (see DTCBinaryLog.py)")
+    parser.add_argument('--rotate', default=None, choices=ROTATIONS, help="Start a new log segment every session, hour or --rotateSize bytes, listed in LOGFILE.manifest")
+    parser.add_argument('--rotateSize', type=int, default=1 << 30, help="Segment size for --rotate size")
+    parser.add_argument('--sessionStart', default='17:00', help="Time of day (HH:MM) sessions start at, for --rotate session")
+    parser.add_argument('--timezone', default=None, help="Time zone of --sessionStart, eg. America/Chicago; default local time")
+    parser.add_argument('--compress', default=None, choices=COMPRESSIONS, help="Write the log as independently compressed blocks (zstd needs the zstandard package)")
 
     args = parser.parse_args()
 
     ADDR = args.address
     PORT = args.port
-    SYMBOL = args.symbol
+    SYMBOLS = args.symbol
     EXCHANGE = args.exchange
 
     username = 'dtc_client'
     password = 'password'
 
-    dtc = DTCClientAsync(True, True)
+    encodings = {
+        'json': DTC.JSON_ENCODING,
+        'json-compact': DTC.JSON_COMPACT_ENCODING,
+        'binary': DTC.BINARY_ENCODING,
+        'protobuf': DTC.PROTOCOL_BUFFERS,
+    }
+
+    backfill = None
+    if args.backfill:
+        address, port = args.backfill.rsplit(':', 1)
+        backfill = (address, int(port))
+
+    if args.raw and (backfill is not None or args.latency):
+        parser.error("--raw does not decode, so it cannot be used with --backfill or --latency")
+    if args.raw and args.binary:
+        parser.error("--raw and --binary are different log formats")
+
+    if args.raw:
+        dtc = DTCClientAsync(False, True, encodings[args.encoding], batch=True, drop_types=[DTC.HEARTBEAT],
+                             raw_record=RawRecord, reconnect=args.reconnect,
+                             transport=args.transport, stale_after=args.staleAfter)
+    elif args.binary:
+        # numpy is only loaded for binary logs
+        from DTCBinaryLog import BinaryLogWriter
+        dtc = DTCClientAsync(True, True, encodings[args.encoding], batch=True, accept_types=BinaryLogWriter.types(),
+                             reconnect=args.reconnect or backfill is not None, backfill=backfill,
+                             transport=args.transport, stale_after=args.staleAfter, latency=args.latency is not None)
+    else:
+        dtc = DTCClientAsync(True, True, encodings[args.encoding],
+                             reconnect=args.reconnect or backfill is not None, backfill=backfill,
+                             transport=args.transport, stale_after=args.staleAfter, latency=args.latency is not None)
     await dtc.connect(ADDR, PORT)
     await dtc.logon(username, password)
 
-    await dtc.send_json_request({
-        "Type": DTC.MARKET_DATA_REQUEST,
-        "RequestAction": DTC.SUBSCRIBE,
-        "SymbolID": 1,
-        "Symbol": SYMBOL,
-        "Exchange": EXCHANGE
-    })
-
-    await dtc.send_json_request({
-        "Type": DTC.MARKET_DEPTH_REQUEST,
-        "RequestAction": DTC.SUBSCRIBE,
-        "SymbolID": 1,
-        "Symbol": SYMBOL,
-        "Exchange": EXCHANGE,
-        "NumLevels": 100
-    })
-
-    mode = 'a' if args.append else 'w'
-    async with aiofiles.open(args.logFile, mode) as log:
+    # everything is logged to one file, so the subscriptions are not routed
+    symbols = {}
+    for symbol in SYMBOLS:
+        sub = await dtc.subscribe(symbol, EXCHANGE, depth_levels=100, route=False)
+        symbols[sub.symbol_id] = symbol
+
+    async def report_latency():
+        while True:
+            await aio.sleep(args.latency)
+            dtc.latency.report(dtc.latency.snapshot(reset=True))
+
+    if args.latency:
+        aio.get_event_loop().create_task(report_latency())
+
+    # stop on ctrl-c/kill by closing the connection, so what is buffered
+    # gets written
+    loop = aio.get_event_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, lambda: loop.create_task(dtc.close()))
+        except NotImplementedError:
+            pass
+
+    # compressed blocks are larger and cut less often, they compress better
+    if args.flushBytes is None:
+        args.flushBytes = 1 << 20 if args.compress else 1 << 16
+    if args.flushDelay is None:
+        args.flushDelay = 1.0 if args.compress else 0.05
+
+    log_kwargs = dict(rotation=args.rotate, max_size=args.rotateSize, session_start=args.sessionStart,
+                      timezone=args.timezone, compression=args.compress, max_bytes=args.flushBytes,
+                      max_delay=args.flushDelay, durability=args.durability)
+
+    if args.raw:
+        log = RotatingLog(args.logFile, RAW, RawHeader(dtc.codec.ENCODING), args.append,
+                          symbols=list(symbols.values()), **log_kwargs)
+        try:
+            async for records in dtc.messages_batch():
+                received_at = dtc.monitor.received_at
+                await log.write_many(records, received_at, received_at)
+        finally:
+            await log.close()
+        return
+
+    if args.binary:
+        log = BinaryLogWriter(args.logFile, symbols, args.append, **log_kwargs)
+        try:
+            async for messages in dtc.messages_batch():
+                await log.write_many(messages, dtc.monitor.received_at)
+        finally:
+            await log.close()
+        return
+
+    log = RotatingLog(args.logFile, JSON_LINES, append=args.append, symbols=list(symbols.values()), **log_kwargs)
+    try:
         async for message in dtc.messages():
-            await log.write(json.dumps(message) + '\n')
-            await log.flush()
+            await log.write(JSON.dumps(message) + b'\n', MessageTime(message, dtc.monitor.received_at))
+    finally:
+        await log.close()
 
 if __name__ == '__main__':
     try:
+        # uvloop is used when it is installed
+        UseUvloop()
         loop = aio.get_event_loop()
         loop.run_until_complete(main())
     except KeyboardInterrupt:
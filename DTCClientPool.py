@@ -0,0 +1,263 @@
+from DTCClient import DTCClientAsync
+from DTCDispatcher import Dispatcher
+from DTCQueue import AsyncMessageQueue, END
+import asyncio as aio
+import multiprocessing as mp
+import time
+
+'''
+Spreads symbols over several DTC connections, optionally each in its own worker
+process so decoding runs on several cores, and merges what they receive into
+one stream.
+
+SymbolIDs are allocated by the pool, so they are unique across connections and
+messages need no remapping. Each symbol goes to a connection picked by policy:
+
+  rate   the connection with the lowest observed message rate (rates are
+         sampled every RATE_INTERVAL seconds), then the fewest symbols
+  count  the connection with the fewest symbols
+
+rebalance() moves the busiest symbol off the busiest connection when that
+evens out the load.
+
+    pool = DTCClientPool(connections=4, processes=True)
+    await pool.connect(address, port, username, password)
+    for symbol in symbols:
+        await pool.subscribe(symbol, 'CME', depth_levels=100)
+    async for message in pool.messages():
+        ...
+'''
+
+RATE = 'rate'
+COUNT = 'count'
+
+class _Subscription:
+
+    def __init__(self, symbol, exchange, market_data, depth_levels, connection):
+        self.symbol = symbol
+        self.exchange = exchange
+        self.market_data = market_data
+        self.depth_levels = depth_levels
+        self.connection = connection
+
+
+class _Connection:
+
+    def __init__(self, index):
+        self.index = index
+        # in process
+        self.client = None
+        # worker process
+        self.process = None
+        self.commands = None
+        self.output = None
+        # pool SymbolIDs subscribed on this connection
+        self.symbols = set()
+
+
+def _Worker(ip_addr, port, username, password, name, client_kwargs, commands, output):
+    try:
+        aio.run(_WorkerMain(ip_addr, port, username, password, name, client_kwargs, commands, output))
+    except KeyboardInterrupt:
+        pass
+
+async def _WorkerMain(ip_addr, port, username, password, name, client_kwargs, commands, output):
+
+    client = DTCClientAsync(batch=True, **client_kwargs)
+    await client.connect(ip_addr, port)
+    await client.logon(username, password, name)
+
+    async def forward():
+        async for batch in client.messages_batch():
+            output.put(batch)
+        output.put(None)
+
+    loop = aio.get_running_loop()
+    forwarder = loop.create_task(forward())
+
+    # commands are (method name, args, kwargs) of DTCClientAsync, None to stop
+    while True:
+        cmd = await loop.run_in_executor(None, commands.get)
+        if cmd is None:
+            break
+        method, args, kwargs = cmd
+        await getattr(client, method)(*args, **kwargs)
+
+    await client.close()
+    await forwarder
+
+
+class DTCClientPool:
+
+    RATE_INTERVAL = 5
+    # weight of the newest sample in the message rates
+    RATE_ALPHA = 0.5
+
+    def __init__(self, connections=2, processes=False, policy=RATE, **client_kwargs):
+        # client_kwargs are passed to every DTCClientAsync, which always runs
+        # in batch mode here
+        if policy not in (RATE, COUNT):
+            raise ValueError("Unknown policy: %s" % policy)
+        self.connections = [_Connection(i) for i in range(connections)]
+        self.processes = processes
+        self.policy = policy
+        self.client_kwargs = client_kwargs
+        self.queue = AsyncMessageQueue()
+        self.dispatcher = Dispatcher()
+        # pool SymbolID -> _Subscription
+        self.subscriptions = {}
+        self.next_symbol_id = 1
+        # per SymbolID message counts and rates (messages/s)
+        self.counts = [0]
+        self.rates = [0.0]
+        self.running = 0
+        self.tasks = []
+
+    async def connect(self, ip_addr, port, username, password, name = "hello"):
+        loop = aio.get_event_loop()
+
+        for conn in self.connections:
+            if self.processes:
+                conn.commands = mp.Queue()
+                conn.output = mp.Queue()
+                conn.process = mp.Process(target=_Worker, daemon=True, args=(
+                    ip_addr, port, username, password, name, self.client_kwargs, conn.commands, conn.output))
+                conn.process.start()
+                self.tasks.append(loop.create_task(self._read_worker(conn)))
+            else:
+                conn.client = DTCClientAsync(batch=True, **self.client_kwargs)
+                await conn.client.connect(ip_addr, port)
+                await conn.client.logon(username, password, name)
+                self.tasks.append(loop.create_task(self._forward(conn)))
+            self.running += 1
+
+        self.tasks.append(loop.create_task(self._sample_rates()))
+
+    def _count(self, batch):
+        counts = self.counts
+        for message in batch:
+            symbol_id = message.get('SymbolID')
+            if symbol_id is not None and symbol_id < len(counts):
+                counts[symbol_id] += 1
+
+    async def _done(self):
+        self.running -= 1
+        if self.running == 0:
+            await self.queue.put(END)
+
+    async def _forward(self, conn):
+        async for batch in conn.client.messages_batch():
+            self._count(batch)
+            await self.queue.put(batch)
+        await self._done()
+
+    async def _read_worker(self, conn):
+        loop = aio.get_event_loop()
+        while True:
+            batch = await loop.run_in_executor(None, conn.output.get)
+            if batch is None:
+                break
+            self._count(batch)
+            await self.queue.put(batch)
+        await self._done()
+
+    async def _sample_rates(self):
+        last = time.monotonic()
+        while True:
+            await aio.sleep(self.RATE_INTERVAL)
+            now = time.monotonic()
+            self.update_rates(now - last)
+            last = now
+
+    def update_rates(self, elapsed):
+        for symbol_id, count in enumerate(self.counts):
+            rate = count / elapsed
+            self.rates[symbol_id] = self.RATE_ALPHA * rate + (1 - self.RATE_ALPHA) * self.rates[symbol_id]
+            self.counts[symbol_id] = 0
+
+    def load(self, conn):
+        return sum(self.rates[symbol_id] for symbol_id in conn.symbols)
+
+    def _pick(self):
+        if self.policy == RATE:
+            return min(self.connections, key=lambda c: (self.load(c), len(c.symbols)))
+        return min(self.connections, key=lambda c: len(c.symbols))
+
+    async def _call(self, conn, method, *args, **kwargs):
+        if conn.client is not None:
+            await getattr(conn.client, method)(*args, **kwargs)
+        else:
+            conn.commands.put((method, args, kwargs))
+
+    async def _subscribe_on(self, conn, symbol_id):
+        sub = self.subscriptions[symbol_id]
+        sub.connection = conn
+        conn.symbols.add(symbol_id)
+        await self._call(conn, 'subscribe', sub.symbol, sub.exchange, sub.market_data, sub.depth_levels,
+                         route=False, symbol_id=symbol_id)
+
+    async def subscribe(self, symbol, exchange, market_data=True, depth_levels=0):
+        # returns the pool wide SymbolID of the symbol
+        symbol_id = self.next_symbol_id
+        self.next_symbol_id += 1
+        self.counts.append(0)
+        self.rates.append(0.0)
+        self.subscriptions[symbol_id] = _Subscription(symbol, exchange, market_data, depth_levels, None)
+        await self._subscribe_on(self._pick(), symbol_id)
+        return symbol_id
+
+    async def unsubscribe(self, symbol_id):
+        sub = self.subscriptions.pop(symbol_id)
+        sub.connection.symbols.discard(symbol_id)
+        await self._call(sub.connection, 'unsubscribe', sub.symbol, sub.exchange)
+
+    async def rebalance(self):
+        # returns the SymbolID that was moved, or None
+        busiest = max(self.connections, key=self.load)
+        idlest = min(self.connections, key=self.load)
+        if busiest is idlest or not busiest.symbols:
+            return None
+        symbol_id = max(busiest.symbols, key=lambda s: self.rates[s])
+        # only move if the gap is larger than what moves, or it just flips
+        if self.load(busiest) - self.load(idlest) <= self.rates[symbol_id]:
+            return None
+        busiest.symbols.discard(symbol_id)
+        sub = self.subscriptions[symbol_id]
+        await self._call(busiest, 'unsubscribe', sub.symbol, sub.exchange)
+        await self._subscribe_on(idlest, symbol_id)
+        return symbol_id
+
+    async def messages(self):
+        while True:
+            res = await self.queue.get()
+            if res == END:
+                return
+            for msg in res:
+                yield msg
+
+    async def messages_batch(self):
+        while True:
+            res = await self.queue.get()
+            if res == END:
+                return
+            yield res
+
+    def on(self, _type, handler, symbol_id = None):
+        self.dispatcher.register(_type, handler, symbol_id)
+
+    async def dispatch(self):
+        async for batch in self.messages_batch():
+            self.dispatcher.dispatch_many(batch)
+
+    async def close(self):
+        loop = aio.get_event_loop()
+        for conn in self.connections:
+            if conn.client is not None:
+                await conn.client.close()
+            elif conn.process is not None:
+                conn.commands.put(None)
+                await loop.run_in_executor(None, conn.process.join, 5)
+        for task in self.tasks:
+            task.cancel()
+        await aio.gather(*self.tasks, return_exceptions=True)
+        await self.queue.put(END)
@@ -0,0 +1,520 @@
+# Generated by GenerateDTCConstants.py from DTCProtocol_pb2.py.  DO NOT EDIT!
+#
+# Enum values, message type numbers and per message field tables of the DTC
+# protocol, without the protobuf runtime.
+
+# DTCVersion
+DTC_VERSION_UNSET = 0
+CURRENT_VERSION = 8
+
+# DTCMessageType
+MESSAGE_TYPE_UNSET = 0
+LOGON_REQUEST = 1
+LOGON_RESPONSE = 2
+HEARTBEAT = 3
+LOGOFF = 5
+ENCODING_REQUEST = 6
+ENCODING_RESPONSE = 7
+MARKET_DATA_REQUEST = 101
+MARKET_DATA_REJECT = 103
+MARKET_DATA_SNAPSHOT = 104
+MARKET_DATA_SNAPSHOT_INT = 125
+MARKET_DATA_UPDATE_TRADE = 107
+MARKET_DATA_UPDATE_TRADE_COMPACT = 112
+MARKET_DATA_UPDATE_TRADE_INT = 126
+MARKET_DATA_UPDATE_LAST_TRADE_SNAPSHOT = 134
+MARKET_DATA_UPDATE_TRADE_WITH_UNBUNDLED_INDICATOR = 137
+MARKET_DATA_UPDATE_TRADE_WITH_UNBUNDLED_INDICATOR_2 = 146
+MARKET_DATA_UPDATE_TRADE_NO_TIMESTAMP = 142
+MARKET_DATA_UPDATE_BID_ASK = 108
+MARKET_DATA_UPDATE_BID_ASK_COMPACT = 117
+MARKET_DATA_UPDATE_BID_ASK_NO_TIMESTAMP = 143
+MARKET_DATA_UPDATE_BID_ASK_INT = 127
+MARKET_DATA_UPDATE_SESSION_OPEN = 120
+MARKET_DATA_UPDATE_SESSION_OPEN_INT = 128
+MARKET_DATA_UPDATE_SESSION_HIGH = 114
+MARKET_DATA_UPDATE_SESSION_HIGH_INT = 129
+MARKET_DATA_UPDATE_SESSION_LOW = 115
+MARKET_DATA_UPDATE_SESSION_LOW_INT = 130
+MARKET_DATA_UPDATE_SESSION_VOLUME = 113
+MARKET_DATA_UPDATE_OPEN_INTEREST = 124
+MARKET_DATA_UPDATE_SESSION_SETTLEMENT = 119
+MARKET_DATA_UPDATE_SESSION_SETTLEMENT_INT = 131
+MARKET_DATA_UPDATE_SESSION_NUM_TRADES = 135
+MARKET_DATA_UPDATE_TRADING_SESSION_DATE = 136
+MARKET_DEPTH_REQUEST = 102
+MARKET_DEPTH_REJECT = 121
+MARKET_DEPTH_SNAPSHOT_LEVEL = 122
+MARKET_DEPTH_SNAPSHOT_LEVEL_INT = 132
+MARKET_DEPTH_SNAPSHOT_LEVEL_FLOAT = 145
+MARKET_DEPTH_UPDATE_LEVEL = 106
+MARKET_DEPTH_UPDATE_LEVEL_FLOAT_WITH_MILLISECONDS = 140
+MARKET_DEPTH_UPDATE_LEVEL_NO_TIMESTAMP = 141
+MARKET_DEPTH_UPDATE_LEVEL_INT = 133
+MARKET_DATA_FEED_STATUS = 100
+MARKET_DATA_FEED_SYMBOL_STATUS = 116
+TRADING_SYMBOL_STATUS = 138
+SUBMIT_NEW_SINGLE_ORDER = 208
+SUBMIT_NEW_SINGLE_ORDER_INT = 206
+SUBMIT_NEW_OCO_ORDER = 201
+SUBMIT_NEW_OCO_ORDER_INT = 207
+SUBMIT_FLATTEN_POSITION_ORDER = 209
+CANCEL_ORDER = 203
+CANCEL_REPLACE_ORDER = 204
+CANCEL_REPLACE_ORDER_INT = 205
+OPEN_ORDERS_REQUEST = 300
+OPEN_ORDERS_REJECT = 302
+ORDER_UPDATE = 301
+HISTORICAL_ORDER_FILLS_REQUEST = 303
+HISTORICAL_ORDER_FILL_RESPONSE = 304
+HISTORICAL_ORDER_FILLS_REJECT = 308
+CURRENT_POSITIONS_REQUEST = 305
+CURRENT_POSITIONS_REJECT = 307
+POSITION_UPDATE = 306
+TRADE_ACCOUNTS_REQUEST = 400
+TRADE_ACCOUNT_RESPONSE = 401
+EXCHANGE_LIST_REQUEST = 500
+EXCHANGE_LIST_RESPONSE = 501
+SYMBOLS_FOR_EXCHANGE_REQUEST = 502
+UNDERLYING_SYMBOLS_FOR_EXCHANGE_REQUEST = 503
+SYMBOLS_FOR_UNDERLYING_REQUEST = 504
+SECURITY_DEFINITION_FOR_SYMBOL_REQUEST = 506
+SECURITY_DEFINITION_RESPONSE = 507
+SYMBOL_SEARCH_REQUEST = 508
+SECURITY_DEFINITION_REJECT = 509
+ACCOUNT_BALANCE_REQUEST = 601
+ACCOUNT_BALANCE_REJECT = 602
+ACCOUNT_BALANCE_UPDATE = 600
+ACCOUNT_BALANCE_ADJUSTMENT = 607
+ACCOUNT_BALANCE_ADJUSTMENT_REJECT = 608
+ACCOUNT_BALANCE_ADJUSTMENT_COMPLETE = 609
+HISTORICAL_ACCOUNT_BALANCES_REQUEST = 603
+HISTORICAL_ACCOUNT_BALANCES_REJECT = 604
+HISTORICAL_ACCOUNT_BALANCE_RESPONSE = 605
+USER_MESSAGE = 700
+GENERAL_LOG_MESSAGE = 701
+ALERT_MESSAGE = 702
+JOURNAL_ENTRY_ADD = 703
+JOURNAL_ENTRIES_REQUEST = 704
+JOURNAL_ENTRIES_REJECT = 705
+JOURNAL_ENTRY_RESPONSE = 706
+HISTORICAL_PRICE_DATA_REQUEST = 800
+HISTORICAL_PRICE_DATA_RESPONSE_HEADER = 801
+HISTORICAL_PRICE_DATA_REJECT = 802
+HISTORICAL_PRICE_DATA_RECORD_RESPONSE = 803
+HISTORICAL_PRICE_DATA_TICK_RECORD_RESPONSE = 804
+HISTORICAL_PRICE_DATA_RECORD_RESPONSE_INT = 805
+HISTORICAL_PRICE_DATA_TICK_RECORD_RESPONSE_INT = 806
+HISTORICAL_PRICE_DATA_RESPONSE_TRAILER = 807
+HISTORICAL_MARKET_DEPTH_DATA_REQUEST = 900
+HISTORICAL_MARKET_DEPTH_DATA_RESPONSE_HEADER = 901
+HISTORICAL_MARKET_DEPTH_DATA_REJECT = 902
+HISTORICAL_MARKET_DEPTH_DATA_RECORD_RESPONSE = 903
+
+# EncodingEnum
+BINARY_ENCODING = 0
+BINARY_WITH_VARIABLE_LENGTH_STRINGS = 1
+JSON_ENCODING = 2
+JSON_COMPACT_ENCODING = 3
+PROTOCOL_BUFFERS = 4
+
+# LogonStatusEnum
+LOGON_STATUS_UNSET = 0
+LOGON_SUCCESS = 1
+LOGON_ERROR = 2
+LOGON_ERROR_NO_RECONNECT = 3
+LOGON_RECONNECT_NEW_ADDRESS = 4
+
+# MessageSupportedEnum
+MESSAGE_UNSUPPORTED = 0
+MESSAGE_SUPPORTED = 1
+
+# TradeModeEnum
+TRADE_MODE_UNSET = 0
+TRADE_MODE_DEMO = 1
+TRADE_MODE_SIMULATED = 2
+TRADE_MODE_LIVE = 3
+
+# RequestActionEnum
+REQUEST_ACTION_UNSET = 0
+SUBSCRIBE = 1
+UNSUBSCRIBE = 2
+SNAPSHOT = 3
+
+# UnbundledTradeIndicatorEnum
+UNBUNDLED_TRADE_NONE = 0
+FIRST_SUB_TRADE_OF_UNBUNDLED_TRADE = 1
+LAST_SUB_TRADE_OF_UNBUNDLED_TRADE = 2
+
+# OrderStatusEnum
+ORDER_STATUS_UNSPECIFIED = 0
+ORDER_STATUS_ORDER_SENT = 1
+ORDER_STATUS_PENDING_OPEN = 2
+ORDER_STATUS_PENDING_CHILD = 3
+ORDER_STATUS_OPEN = 4
+ORDER_STATUS_PENDING_CANCEL_REPLACE = 5
+ORDER_STATUS_PENDING_CANCEL = 6
+ORDER_STATUS_FILLED = 7
+ORDER_STATUS_CANCELED = 8
+ORDER_STATUS_REJECTED = 9
+ORDER_STATUS_PARTIALLY_FILLED = 10
+
+# OrderUpdateReasonEnum
+ORDER_UPDATE_REASON_UNSET = 0
+OPEN_ORDERS_REQUEST_RESPONSE = 1
+NEW_ORDER_ACCEPTED = 2
+GENERAL_ORDER_UPDATE = 3
+ORDER_FILLED = 4
+ORDER_FILLED_PARTIALLY = 5
+ORDER_CANCELED = 6
+ORDER_CANCEL_REPLACE_COMPLETE = 7
+NEW_ORDER_REJECTED = 8
+ORDER_CANCEL_REJECTED = 9
+ORDER_CANCEL_REPLACE_REJECTED = 10
+
+# AtBidOrAskEnum
+BID_ASK_UNSET = 0
+AT_BID = 1
+AT_ASK = 2
+
+# AtBidOrAskEnum8
+BID_ASK_UNSET_8 = 0
+AT_BID_8 = 1
+AT_ASK_8 = 2
+
+# MarketDepthUpdateTypeEnum
+DEPTH_UNSET = 0
+MARKET_DEPTH_INSERT_UPDATE_LEVEL = 1
+MARKET_DEPTH_DELETE_LEVEL = 2
+
+# FinalUpdateInBatchEnum
+FINAL_UPDATE_UNSET = 0
+FINAL_UPDATE_TRUE = 1
+FINAL_UPDATE_FALSE = 2
+FINAL_UPDATE_BEGIN_BATCH = 3
+
+# OrderTypeEnum
+ORDER_TYPE_UNSET = 0
+ORDER_TYPE_MARKET = 1
+ORDER_TYPE_LIMIT = 2
+ORDER_TYPE_STOP = 3
+ORDER_TYPE_STOP_LIMIT = 4
+ORDER_TYPE_MARKET_IF_TOUCHED = 5
+ORDER_TYPE_LIMIT_IF_TOUCHED = 6
+
+# TimeInForceEnum
+TIF_UNSET = 0
+TIF_DAY = 1
+TIF_GOOD_TILL_CANCELED = 2
+TIF_GOOD_TILL_DATE_TIME = 3
+TIF_IMMEDIATE_OR_CANCEL = 4
+TIF_ALL_OR_NONE = 5
+TIF_FILL_OR_KILL = 6
+
+# BuySellEnum
+BUY_SELL_UNSET = 0
+BUY = 1
+SELL = 2
+
+# OpenCloseTradeEnum
+TRADE_UNSET = 0
+TRADE_OPEN = 1
+TRADE_CLOSE = 2
+
+# PartialFillHandlingEnum
+PARTIAL_FILL_UNSET = 0
+PARTIAL_FILL_HANDLING_REDUCE_QUANTITY = 1
+PARTIAL_FILL_HANDLING_IMMEDIATE_CANCEL = 2
+
+# MarketDataFeedStatusEnum
+MARKET_DATA_FEED_STATUS_UNSET = 0
+MARKET_DATA_FEED_UNAVAILABLE = 1
+MARKET_DATA_FEED_AVAILABLE = 2
+
+# PriceDisplayFormatEnum
+PRICE_DISPLAY_FORMAT_DECIMAL_0 = 0
+PRICE_DISPLAY_FORMAT_DECIMAL_1 = 1
+PRICE_DISPLAY_FORMAT_DECIMAL_2 = 2
+PRICE_DISPLAY_FORMAT_DECIMAL_3 = 3
+PRICE_DISPLAY_FORMAT_DECIMAL_4 = 4
+PRICE_DISPLAY_FORMAT_DECIMAL_5 = 5
+PRICE_DISPLAY_FORMAT_DECIMAL_6 = 6
+PRICE_DISPLAY_FORMAT_DECIMAL_7 = 7
+PRICE_DISPLAY_FORMAT_DECIMAL_8 = 8
+PRICE_DISPLAY_FORMAT_DECIMAL_9 = 9
+PRICE_DISPLAY_FORMAT_DENOMINATOR_256 = 356
+PRICE_DISPLAY_FORMAT_DENOMINATOR_128 = 228
+PRICE_DISPLAY_FORMAT_DENOMINATOR_64 = 164
+PRICE_DISPLAY_FORMAT_DENOMINATOR_32_QUARTERS = 136
+PRICE_DISPLAY_FORMAT_DENOMINATOR_32_HALVES = 134
+PRICE_DISPLAY_FORMAT_DENOMINATOR_32 = 132
+PRICE_DISPLAY_FORMAT_DENOMINATOR_16 = 116
+PRICE_DISPLAY_FORMAT_DENOMINATOR_8 = 108
+PRICE_DISPLAY_FORMAT_DENOMINATOR_4 = 104
+PRICE_DISPLAY_FORMAT_DENOMINATOR_2 = 102
+PRICE_DISPLAY_FORMAT_UNSET = -1
+
+# SecurityTypeEnum
+SECURITY_TYPE_UNSET = 0
+SECURITY_TYPE_FUTURE = 1
+SECURITY_TYPE_STOCK = 2
+SECURITY_TYPE_FOREX = 3
+SECURITY_TYPE_INDEX = 4
+SECURITY_TYPE_FUTURES_STRATEGY = 5
+SECURITY_TYPE_FUTURES_OPTION = 7
+SECURITY_TYPE_STOCK_OPTION = 6
+SECURITY_TYPE_INDEX_OPTION = 8
+SECURITY_TYPE_BOND = 9
+SECURITY_TYPE_MUTUAL_FUND = 10
+
+# PutCallEnum
+PC_UNSET = 0
+PC_CALL = 1
+PC_PUT = 2
+
+# SearchTypeEnum
+SEARCH_TYPE_UNSET = 0
+SEARCH_TYPE_BY_SYMBOL = 1
+SEARCH_TYPE_BY_DESCRIPTION = 2
+
+# HistoricalDataIntervalEnum
+INTERVAL_TICK = 0
+INTERVAL_1_SECOND = 1
+INTERVAL_2_SECONDS = 2
+INTERVAL_4_SECONDS = 4
+INTERVAL_5_SECONDS = 5
+INTERVAL_10_SECONDS = 10
+INTERVAL_30_SECONDS = 30
+INTERVAL_1_MINUTE = 60
+INTERVAL_5_MINUTE = 300
+INTERVAL_10_MINUTE = 600
+INTERVAL_15_MINUTE = 900
+INTERVAL_30_MINUTE = 1800
+INTERVAL_1_HOUR = 3600
+INTERVAL_2_HOURS = 7200
+INTERVAL_1_DAY = 86400
+INTERVAL_1_WEEK = 604800
+
+# HistoricalPriceDataRejectReasonCodeEnum
+HPDR_UNSET = 0
+HPDR_UNABLE_TO_SERVE_DATA_RETRY_LATER = 1
+HPDR_UNABLE_TO_SERVE_DATA_DO_NOT_RETRY = 2
+HPDR_DATA_REQUEST_OUTSIDE_BOUNDS_OF_AVAILABLE_DATA = 3
+HPDR_GENERAL_REJECT_ERROR = 4
+
+# TradingStatusEnum
+TRADING_STATUS_UNKNOWN = 0
+TRADING_STATUS_PRE_OPEN = 1
+TRADING_STATUS_OPEN = 2
+TRADING_STATUS_CLOSE = 3
+TRADING_STATUS_TRADING_HALT = 4
+
+# message type -> protobuf message name
+MESSAGE_NAMES = {
+    1: 'LogonRequest',
+    2: 'LogonResponse',
+    3: 'Heartbeat',
+    5: 'Logoff',
+    6: 'EncodingRequest',
+    7: 'EncodingResponse',
+    101: 'MarketDataRequest',
+    103: 'MarketDataReject',
+    104: 'MarketDataSnapshot',
+    125: 'MarketDataSnapshot_Int',
+    107: 'MarketDataUpdateTrade',
+    112: 'MarketDataUpdateTradeCompact',
+    126: 'MarketDataUpdateTrade_Int',
+    134: 'MarketDataUpdateLastTradeSnapshot',
+    137: 'MarketDataUpdateTradeWithUnbundledIndicator',
+    146: 'MarketDataUpdateTradeWithUnbundledIndicator2',
+    142: 'MarketDataUpdateTradeNoTimestamp',
+    108: 'MarketDataUpdateBidAsk',
+    117: 'MarketDataUpdateBidAskCompact',
+    143: 'MarketDataUpdateBidAskNoTimeStamp',
+    127: 'MarketDataUpdateBidAsk_Int',
+    120: 'MarketDataUpdateSessionOpen',
+    128: 'MarketDataUpdateSessionOpen_Int',
+    114: 'MarketDataUpdateSessionHigh',
+    129: 'MarketDataUpdateSessionHigh_Int',
+    115: 'MarketDataUpdateSessionLow',
+    130: 'MarketDataUpdateSessionLow_Int',
+    113: 'MarketDataUpdateSessionVolume',
+    124: 'MarketDataUpdateOpenInterest',
+    119: 'MarketDataUpdateSessionSettlement',
+    131: 'MarketDataUpdateSessionSettlement_Int',
+    135: 'MarketDataUpdateSessionNumTrades',
+    136: 'MarketDataUpdateTradingSessionDate',
+    102: 'MarketDepthRequest',
+    121: 'MarketDepthReject',
+    122: 'MarketDepthSnapshotLevel',
+    132: 'MarketDepthSnapshotLevel_Int',
+    145: 'MarketDepthSnapshotLevelFloat',
+    106: 'MarketDepthUpdateLevel',
+    140: 'MarketDepthUpdateLevelFloatWithMilliseconds',
+    141: 'MarketDepthUpdateLevelNoTimestamp',
+    133: 'MarketDepthUpdateLevel_Int',
+    100: 'MarketDataFeedStatus',
+    116: 'MarketDataFeedSymbolStatus',
+    138: 'TradingSymbolStatus',
+    208: 'SubmitNewSingleOrder',
+    206: 'SubmitNewSingleOrderInt',
+    201: 'SubmitNewOCOOrder',
+    207: 'SubmitNewOCOOrderInt',
+    209: 'SubmitFlattenPositionOrder',
+    203: 'CancelOrder',
+    204: 'CancelReplaceOrder',
+    205: 'CancelReplaceOrderInt',
+    300: 'OpenOrdersRequest',
+    302: 'OpenOrdersReject',
+    301: 'OrderUpdate',
+    303: 'HistoricalOrderFillsRequest',
+    304: 'HistoricalOrderFillResponse',
+    308: 'HistoricalOrderFillsReject',
+    305: 'CurrentPositionsRequest',
+    307: 'CurrentPositionsReject',
+    306: 'PositionUpdate',
+    400: 'TradeAccountsRequest',
+    401: 'TradeAccountResponse',
+    500: 'ExchangeListRequest',
+    501: 'ExchangeListResponse',
+    502: 'SymbolsForExchangeRequest',
+    503: 'UnderlyingSymbolsForExchangeRequest',
+    504: 'SymbolsForUnderlyingRequest',
+    506: 'SecurityDefinitionForSymbolRequest',
+    507: 'SecurityDefinitionResponse',
+    508: 'SymbolSearchRequest',
+    509: 'SecurityDefinitionReject',
+    601: 'AccountBalanceRequest',
+    602: 'AccountBalanceReject',
+    600: 'AccountBalanceUpdate',
+    607: 'AccountBalanceAdjustment',
+    608: 'AccountBalanceAdjustmentReject',
+    609: 'AccountBalanceAdjustmentComplete',
+    603: 'HistoricalAccountBalancesRequest',
+    604: 'HistoricalAccountBalancesReject',
+    605: 'HistoricalAccountBalanceResponse',
+    700: 'UserMessage',
+    701: 'GeneralLogMessage',
+    702: 'AlertMessage',
+    703: 'JournalEntryAdd',
+    704: 'JournalEntriesRequest',
+    705: 'JournalEntriesReject',
+    706: 'JournalEntryResponse',
+    800: 'HistoricalPriceDataRequest',
+    801: 'HistoricalPriceDataResponseHeader',
+    802: 'HistoricalPriceDataReject',
+    803: 'HistoricalPriceDataRecordResponse',
+    804: 'HistoricalPriceDataTickRecordResponse',
+    805: 'HistoricalPriceDataRecordResponse_Int',
+    806: 'HistoricalPriceDataTickRecordResponse_Int',
+    807: 'HistoricalPriceDataResponseTrailer',
+    900: 'HistoricalMarketDepthDataRequest',
+    901: 'HistoricalMarketDepthDataResponseHeader',
+    902: 'HistoricalMarketDepthDataReject',
+    903: 'HistoricalMarketDepthDataRecordResponse',
+}
+
+# message type -> ((field name, default value), ...) in proto field order
+MESSAGE_FIELDS = {
+    1: (('ProtocolVersion', 0), ('Username', ''), ('Password', ''), ('GeneralTextData', ''), ('Integer_1', 0), ('Integer_2', 0), ('HeartbeatIntervalInSeconds', 0), ('TradeMode', 0), ('TradeAccount', ''), ('HardwareIdentifier', ''), ('ClientName', ''), ('MarketDataTransmissionInterval', 0)),
+    2: (('ProtocolVersion', 0), ('Result', 0), ('ResultText', ''), ('ReconnectAddress', ''), ('Integer_1', 0), ('ServerName', ''), ('MarketDepthUpdatesBestBidAndAsk', 0), ('TradingIsSupported', 0), ('OCOOrdersSupported', 0), ('OrderCancelReplaceSupported', 0), ('SymbolExchangeDelimiter', ''), ('SecurityDefinitionsSupported', 0), ('HistoricalPriceDataSupported', 0), ('ResubscribeWhenMarketDataFeedAvailable', 0), ('MarketDepthIsSupported', 0), ('OneHistoricalPriceDataRequestPerConnection', 0), ('BracketOrdersSupported', 0), ('UseIntegerPriceOrderMessages', 0), ('UsesMultiplePositionsPerSymbolAndTradeAccount', 0), ('MarketDataSupported', 0)),
+    3: (('NumDroppedMessages', 0), ('CurrentDateTime', 0)),
+    5: (('Reason', ''), ('DoNotReconnect', 0)),
+    6: (('ProtocolVersion', 0), ('Encoding', 0), ('ProtocolType', '')),
+    7: (('ProtocolVersion', 0), ('Encoding', 0), ('ProtocolType', '')),
+    101: (('RequestAction', 0), ('SymbolID', 0), ('Symbol', ''), ('Exchange', ''), ('IntervalForSnapshotUpdatesInMilliseconds', 0)),
+    103: (('SymbolID', 0), ('RejectText', '')),
+    104: (('SymbolID', 0), ('SessionSettlementPrice', 0.0), ('SessionOpenPrice', 0.0), ('SessionHighPrice', 0.0), ('SessionLowPrice', 0.0), ('SessionVolume', 0.0), ('SessionNumTrades', 0), ('OpenInterest', 0), ('BidPrice', 0.0), ('AskPrice', 0.0), ('AskQuantity', 0.0), ('BidQuantity', 0.0), ('LastTradePrice', 0.0), ('LastTradeVolume', 0.0), ('LastTradeDateTime', 0.0), ('BidAskDateTime', 0.0), ('SessionSettlementDateTime', 0), ('TradingSessionDate', 0), ('TradingStatus', 0), ('MarketDepthUpdateDateTime', 0.0)),
+    125: (('SymbolID', 0), ('SessionSettlementPrice', 0), ('SessionOpenPrice', 0), ('SessionHighPrice', 0), ('SessionLowPrice', 0), ('SessionVolume', 0), ('SessionNumTrades', 0), ('OpenInterest', 0), ('BidPrice', 0), ('AskPrice', 0), ('AskQuantity', 0), ('BidQuantity', 0), ('LastTradePrice', 0), ('LastTradeVolume', 0), ('LastTradeDateTime', 0.0), ('BidAskDateTime', 0.0), ('SessionSettlementDateTime', 0), ('TradingSessionDate', 0), ('TradingStatus', 0)),
+    107: (('SymbolID', 0), ('AtBidOrAsk', 0), ('Price', 0.0), ('Volume', 0.0), ('DateTime', 0.0)),
+    112: (('Price', 0.0), ('Volume', 0.0), ('DateTime', 0), ('SymbolID', 0), ('AtBidOrAsk', 0)),
+    126: (('SymbolID', 0), ('AtBidOrAsk', 0), ('Price', 0), ('Volume', 0), ('DateTime', 0.0)),
+    134: (('SymbolID', 0), ('LastTradePrice', 0.0), ('LastTradeVolume', 0.0), ('LastTradeDateTime', 0.0)),
+    137: (('SymbolID', 0), ('AtBidOrAsk', 0), ('UnbundledTradeIndicator', 0), ('Price', 0.0), ('Volume', 0), ('DateTime', 0.0), ('TradeCondition', 0)),
+    146: (('SymbolID', 0), ('Price', 0.0), ('Volume', 0), ('DateTime', 0), ('AtBidOrAsk', 0), ('UnbundledTradeIndicator', 0), ('TradeCondition', 0)),
+    142: (('SymbolID', 0), ('Price', 0.0), ('Volume', 0), ('AtBidOrAsk', 0), ('UnbundledTradeIndicator', 0), ('TradeCondition', 0)),
+    108: (('SymbolID', 0), ('BidPrice', 0.0), ('BidQuantity', 0.0), ('AskPrice', 0.0), ('AskQuantity', 0.0), ('DateTime', 0)),
+    117: (('BidPrice', 0.0), ('BidQuantity', 0.0), ('AskPrice', 0.0), ('AskQuantity', 0.0), ('DateTime', 0), ('SymbolID', 0)),
+    143: (('SymbolID', 0), ('BidPrice', 0.0), ('BidQuantity', 0), ('AskPrice', 0.0), ('AskQuantity', 0)),
+    127: (('SymbolID', 0), ('BidPrice', 0), ('BidQuantity', 0), ('AskPrice', 0), ('AskQuantity', 0), ('DateTime', 0)),
+    120: (('SymbolID', 0), ('Price', 0.0), ('TradingSessionDate', 0)),
+    128: (('SymbolID', 0), ('Price', 0), ('TradingSessionDate', 0)),
+    114: (('SymbolID', 0), ('Price', 0.0), ('TradingSessionDate', 0)),
+    129: (('SymbolID', 0), ('Price', 0), ('TradingSessionDate', 0)),
+    115: (('SymbolID', 0), ('Price', 0.0), ('TradingSessionDate', 0)),
+    130: (('SymbolID', 0), ('Price', 0), ('TradingSessionDate', 0)),
+    113: (('SymbolID', 0), ('Volume', 0.0), ('TradingSessionDate', 0), ('IsFinalSessionVolume', 0)),
+    124: (('SymbolID', 0), ('OpenInterest', 0), ('TradingSessionDate', 0)),
+    119: (('SymbolID', 0), ('Price', 0.0), ('DateTime', 0)),
+    131: (('SymbolID', 0), ('Price', 0), ('DateTime', 0)),
+    135: (('SymbolID', 0), ('NumTrades', 0), ('TradingSessionDate', 0)),
+    136: (('SymbolID', 0), ('Date', 0)),
+    102: (('RequestAction', 0), ('SymbolID', 0), ('Symbol', ''), ('Exchange', ''), ('NumLevels', 0)),
+    121: (('SymbolID', 0), ('RejectText', '')),
+    122: (('SymbolID', 0), ('Side', 0), ('Price', 0.0), ('Quantity', 0.0), ('Level', 0), ('IsFirstMessageInBatch', 0), ('IsLastMessageInBatch', 0), ('DateTime', 0.0), ('NumOrders', 0)),
+    132: (('SymbolID', 0), ('Side', 0), ('Price', 0), ('Quantity', 0), ('Level', 0), ('IsFirstMessageInBatch', 0), ('IsLastMessageInBatch', 0), ('DateTime', 0.0), ('NumOrders', 0)),
+    145: (('SymbolID', 0), ('Price', 0.0), ('Quantity', 0.0), ('NumOrders', 0), ('Level', 0), ('Side', 0), ('FinalUpdateInBatch', 0)),
+    106: (('SymbolID', 0), ('Side', 0), ('Price', 0.0), ('Quantity', 0.0), ('UpdateType', 0), ('DateTime', 0.0), ('NumOrders', 0)),
+    140: (('SymbolID', 0), ('DateTime', 0), ('Price', 0.0), ('Quantity', 0.0), ('Side', 0), ('UpdateType', 0), ('NumOrders', 0), ('FinalUpdateInBatch', 0)),
+    141: (('SymbolID', 0), ('Price', 0.0), ('Quantity', 0.0), ('NumOrders', 0), ('Side', 0), ('UpdateType', 0), ('FinalUpdateInBatch', 0)),
+    133: (('SymbolID', 0), ('Side', 0), ('Price', 0), ('Quantity', 0), ('UpdateType', 0), ('DateTime', 0.0), ('NumOrders', 0)),
+    100: (('Status', 0),),
+    116: (('SymbolID', 0), ('Status', 0)),
+    138: (('SymbolID', 0), ('Status', 0)),
+    208: (('Symbol', ''), ('Exchange', ''), ('TradeAccount', ''), ('ClientOrderID', ''), ('OrderType', 0), ('BuySell', 0), ('Price1', 0.0), ('Price2', 0.0), ('Quantity', 0.0), ('TimeInForce', 0), ('GoodTillDateTime', 0), ('IsAutomatedOrder', 0), ('IsParentOrder', 0), ('FreeFormText', ''), ('OpenOrClose', 0), ('MaxShowQuantity', 0.0)),
+    206: (('Symbol', ''), ('Exchange', ''), ('TradeAccount', ''), ('ClientOrderID', ''), ('OrderType', 0), ('BuySell', 0), ('Price1', 0), ('Price2', 0), ('Divisor', 0.0), ('Quantity', 0), ('TimeInForce', 0), ('GoodTillDateTime', 0), ('IsAutomatedOrder', 0), ('IsParentOrder', 0), ('FreeFormText', ''), ('OpenOrClose', 0)),
+    201: (('Symbol', ''), ('Exchange', ''), ('ClientOrderID_1', ''), ('OrderType_1', 0), ('BuySell_1', 0), ('Price1_1', 0.0), ('Price2_1', 0.0), ('Quantity_1', 0.0), ('ClientOrderID_2', ''), ('OrderType_2', 0), ('BuySell_2', 0), ('Price1_2', 0.0), ('Price2_2', 0.0), ('Quantity_2', 0.0), ('TimeInForce', 0), ('GoodTillDateTime', 0), ('TradeAccount', ''), ('IsAutomatedOrder', 0), ('ParentTriggerClientOrderID', ''), ('FreeFormText', ''), ('OpenOrClose', 0), ('PartialFillHandling', 0), ('UseOffsets', 0), ('OffsetFromParent1', 0.0), ('OffsetFromParent2', 0.0)),
+    207: (('Symbol', ''), ('Exchange', ''), ('ClientOrderID_1', ''), ('OrderType_1', 0), ('BuySell_1', 0), ('Price1_1', 0), ('Price2_1', 0), ('Quantity_1', 0), ('ClientOrderID_2', ''), ('OrderType_2', 0), ('BuySell_2', 0), ('Price1_2', 0), ('Price2_2', 0), ('Quantity_2', 0), ('TimeInForce', 0), ('GoodTillDateTime', 0), ('TradeAccount', ''), ('IsAutomatedOrder', 0), ('ParentTriggerClientOrderID', ''), ('FreeFormText', ''), ('Divisor', 0.0), ('OpenOrClose', 0), ('PartialFillHandling', 0)),
+    209: (('Symbol', ''), ('Exchange', ''), ('TradeAccount', ''), ('ClientOrderID', ''), ('FreeFormText', ''), ('IsAutomatedOrder', 0)),
+    203: (('ServerOrderID', ''), ('ClientOrderID', ''), ('TradeAccount', '')),
+    204: (('ServerOrderID', ''), ('ClientOrderID', ''), ('Price1', 0.0), ('Price2', 0.0), ('Quantity', 0.0), ('Price1IsSet', 0), ('Price2IsSet', 0), ('TimeInForce', 0), ('GoodTillDateTime', 0), ('UpdatePrice1OffsetToParent', 0), ('TradeAccount', '')),
+    205: (('ServerOrderID', ''), ('ClientOrderID', ''), ('Price1', 0), ('Price2', 0), ('Divisor', 0.0), ('Quantity', 0), ('Price1IsSet', 0), ('Price2IsSet', 0), ('TimeInForce', 0), ('GoodTillDateTime', 0), ('UpdatePrice1OffsetToParent', 0)),
+    300: (('RequestID', 0), ('RequestAllOrders', 0), ('ServerOrderID', ''), ('TradeAccount', '')),
+    302: (('RequestID', 0), ('RejectText', '')),
+    301: (('RequestID', 0), ('TotalNumMessages', 0), ('MessageNumber', 0), ('Symbol', ''), ('Exchange', ''), ('PreviousServerOrderID', ''), ('ServerOrderID', ''), ('ClientOrderID', ''), ('ExchangeOrderID', ''), ('OrderStatus', 0), ('OrderUpdateReason', 0), ('OrderType', 0), ('BuySell', 0), ('Price1', 0.0), ('Price2', 0.0), ('TimeInForce', 0), ('GoodTillDateTime', 0), ('OrderQuantity', 0.0), ('FilledQuantity', 0.0), ('RemainingQuantity', 0.0), ('AverageFillPrice', 0.0), ('LastFillPrice', 0.0), ('LastFillDateTime', 0), ('LastFillQuantity', 0.0), ('LastFillExecutionID', ''), ('TradeAccount', ''), ('InfoText', ''), ('NoOrders', 0), ('ParentServerOrderID', ''), ('OCOLinkedOrderServerOrderID', ''), ('OpenOrClose', 0), ('PreviousClientOrderID', ''), ('FreeFormText', ''), ('OrderReceivedDateTime', 0), ('LatestTransactionDateTime', 0.0)),
+    303: (('RequestID', 0), ('ServerOrderID', ''), ('NumberOfDays', 0), ('TradeAccount', ''), ('StartDateTime', 0)),
+    304: (('RequestID', 0), ('TotalNumberMessages', 0), ('MessageNumber', 0), ('Symbol', ''), ('Exchange', ''), ('ServerOrderID', ''), ('BuySell', 0), ('Price', 0.0), ('DateTime', 0), ('Quantity', 0.0), ('UniqueExecutionID', ''), ('TradeAccount', ''), ('OpenClose', 0), ('NoOrderFills', 0), ('InfoText', ''), ('HighPriceDuringPosition', 0.0), ('LowPriceDuringPosition', 0.0), ('PositionQuantity', 0.0)),
+    308: (('RequestID', 0), ('RejectText', '')),
+    305: (('RequestID', 0), ('TradeAccount', '')),
+    307: (('RequestID', 0), ('RejectText', '')),
+    306: (('RequestID', 0), ('TotalNumberMessages', 0), ('MessageNumber', 0), ('Symbol', ''), ('Exchange', ''), ('Quantity', 0.0), ('AveragePrice', 0.0), ('PositionIdentifier', ''), ('TradeAccount', ''), ('NoPositions', 0), ('Unsolicited', 0), ('MarginRequirement', 0.0), ('EntryDateTime', 0)),
+    400: (('RequestID', 0),),
+    401: (('TotalNumberMessages', 0), ('MessageNumber', 0), ('TradeAccount', ''), ('RequestID', 0)),
+    500: (('RequestID', 0),),
+    501: (('RequestID', 0), ('Exchange', ''), ('IsFinalMessage', 0), ('Description', '')),
+    502: (('RequestID', 0), ('Exchange', ''), ('SecurityType', 0), ('RequestAction', 0), ('Symbol', '')),
+    503: (('RequestID', 0), ('Exchange', ''), ('SecurityType', 0)),
+    504: (('RequestID', 0), ('UnderlyingSymbol', ''), ('Exchange', ''), ('SecurityType', 0)),
+    506: (('RequestID', 0), ('Symbol', ''), ('Exchange', '')),
+    507: (('RequestID', 0), ('Symbol', ''), ('Exchange', ''), ('SecurityType', 0), ('Description', ''), ('MinPriceIncrement', 0.0), ('PriceDisplayFormat', 0), ('CurrencyValuePerIncrement', 0.0), ('IsFinalMessage', 0), ('FloatToIntPriceMultiplier', 0.0), ('IntToFloatPriceDivisor', 0.0), ('UnderlyingSymbol', ''), ('UpdatesBidAskOnly', 0), ('StrikePrice', 0.0), ('PutOrCall', 0), ('ShortInterest', 0), ('SecurityExpirationDate', 0), ('BuyRolloverInterest', 0.0), ('SellRolloverInterest', 0.0), ('EarningsPerShare', 0.0), ('SharesOutstanding', 0), ('IntToFloatQuantityDivisor', 0.0), ('HasMarketDepthData', 0), ('DisplayPriceMultiplier', 0.0), ('ExchangeSymbol', ''), ('InitialMarginRequirement', 0.0), ('MaintenanceMarginRequirement', 0.0), ('Currency', ''), ('ContractSize', 0.0), ('OpenInterest', 0), ('RolloverDate', 0), ('IsDelayed', 0)),
+    508: (('RequestID', 0), ('SearchText', ''), ('Exchange', ''), ('SecurityType', 0), ('SearchType', 0)),
+    509: (('RequestID', 0), ('RejectText', '')),
+    601: (('RequestID', 0), ('TradeAccount', '')),
+    602: (('RequestID', 0), ('RejectText', '')),
+    600: (('RequestID', 0), ('CashBalance', 0.0), ('BalanceAvailableForNewPositions', 0.0), ('AccountCurrency', ''), ('TradeAccount', ''), ('SecuritiesValue', 0.0), ('MarginRequirement', 0.0), ('TotalNumberMessages', 0), ('MessageNumber', 0), ('NoAccountBalances', 0), ('Unsolicited', 0), ('OpenPositionsProfitLoss', 0.0), ('DailyProfitLoss', 0.0), ('InfoText', ''), ('TransactionIdentifier', 0), ('DailyNetLossLimit', 0.0), ('TrailingAccountValueToLimitPositions', 0.0)),
+    607: (('RequestID', 0), ('CreditAmount', 0.0), ('DebitAmount', 0.0), ('Currency', ''), ('Reason', ''), ('TradeAccount', '')),
+    608: (('RequestID', 0), ('RejectText', '')),
+    609: (('RequestID', 0), ('TransactionID', 0)),
+    603: (('RequestID', 0), ('TradeAccount', ''), ('StartDateTime', 0)),
+    604: (('RequestID', 0), ('RejectText', '')),
+    605: (('RequestID', 0), ('DateTime', 0.0), ('CashBalance', 0.0), ('AccountCurrency', ''), ('TradeAccount', ''), ('IsFinalResponse', 0), ('NoAccountBalances', 0), ('InfoText', ''), ('TransactionId', '')),
+    700: (('UserMessage', ''), ('IsPopupMessage', 0)),
+    701: (('MessageText', ''),),
+    702: (('MessageText', ''), ('TradeAccount', '')),
+    703: (('JournalEntry', ''), ('DateTime', 0)),
+    704: (('RequestID', 0), ('StartDateTime', 0)),
+    705: (('RequestID', 0), ('RejectText', '')),
+    706: (('JournalEntry', ''), ('DateTime', 0), ('IsFinalResponse', 0)),
+    800: (('RequestID', 0), ('Symbol', ''), ('Exchange', ''), ('RecordInterval', 0), ('StartDateTime', 0), ('EndDateTime', 0), ('MaxDaysToReturn', 0), ('UseZLibCompression', 0), ('RequestDividendAdjustedStockData', 0), ('Integer_1', 0)),
+    801: (('RequestID', 0), ('RecordInterval', 0), ('UseZLibCompression', 0), ('NoRecordsToReturn', 0), ('IntToFloatPriceDivisor', 0.0)),
+    802: (('RequestID', 0), ('RejectText', ''), ('RejectReasonCode', 0), ('RetryTimeInSeconds', 0)),
+    803: (('RequestID', 0), ('StartDateTime', 0), ('OpenPrice', 0.0), ('HighPrice', 0.0), ('LowPrice', 0.0), ('LastPrice', 0.0), ('Volume', 0.0), ('NumTrades', 0), ('BidVolume', 0.0), ('AskVolume', 0.0), ('IsFinalRecord', 0)),
+    804: (('RequestID', 0), ('DateTime', 0.0), ('AtBidOrAsk', 0), ('Price', 0.0), ('Volume', 0.0), ('IsFinalRecord', 0)),
+    805: (('RequestID', 0), ('StartDateTime', 0), ('OpenPrice', 0), ('HighPrice', 0), ('LowPrice', 0), ('LastPrice', 0), ('Volume', 0), ('NumTrades', 0), ('BidVolume', 0), ('AskVolume', 0), ('IsFinalRecord', 0)),
+    806: (('RequestID', 0), ('DateTime', 0.0), ('Price', 0), ('Volume', 0), ('AtBidOrAsk', 0), ('IsFinalRecord', 0)),
+    807: (('RequestID', 0), ('FinalRecordLastDateTime', 0)),
+    900: (('RequestID', 0), ('Symbol', ''), ('Exchange', ''), ('StartDateTime', 0), ('EndDateTime', 0), ('UseZLibCompression', 0), ('Integer_1', 0)),
+    901: (('RequestID', 0), ('UseZLibCompression', 0), ('NoRecordsToReturn', 0)),
+    902: (('RequestID', 0), ('RejectText', ''), ('RejectReasonCode', 0)),
+    903: (('RequestID', 0), ('StartDateTime', 0), ('Command', 0), ('Flags', 0), ('NumOrders', 0), ('Price', 0.0), ('Quantity', 0), ('IsFinalRecord', 0)),
+}
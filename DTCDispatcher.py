@@ -0,0 +1,46 @@
+'''
+Routes decoded messages to handlers registered per message type, and
+optionally per SymbolID. Lookups are single dict hits keyed on the message
+type (or type and SymbolID); messages nobody registered for are dropped.
+'''
+
+class Dispatcher:
+
+    def __init__(self):
+        # type -> [handler]
+        self.handlers = {}
+        # (type, SymbolID) -> [handler]
+        self.symbol_handlers = {}
+
+    def register(self, _type, handler, symbol_id = None):
+        if symbol_id is None:
+            self.handlers.setdefault(_type, []).append(handler)
+        else:
+            self.symbol_handlers.setdefault((_type, symbol_id), []).append(handler)
+
+    def unregister(self, _type, handler, symbol_id = None):
+        table, key = (self.handlers, _type) if symbol_id is None else (self.symbol_handlers, (_type, symbol_id))
+        handlers = table.get(key)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del table[key]
+
+    def types(self):
+        return set(self.handlers) | set(_type for _type, _ in self.symbol_handlers)
+
+    def dispatch(self, message):
+        _type = message['Type']
+        handlers = self.handlers.get(_type)
+        if handlers is not None:
+            for handler in handlers:
+                handler(message)
+        if self.symbol_handlers:
+            handlers = self.symbol_handlers.get((_type, message.get('SymbolID')))
+            if handlers is not None:
+                for handler in handlers:
+                    handler(message)
+
+    def dispatch_many(self, messages):
+        for message in messages:
+            self.dispatch(message)
@@ -0,0 +1,385 @@
+import DTCConstants as DTC
+import struct
+import json
+import re
+
+'''
+Codecs for the wire encodings a DTC server can negotiate.
+
+A codec knows how a frame is delimited on the wire (read_frame), how to turn a
+received frame into a message dict (decode) and how to turn a request dict into
+a frame (encode). Frames are kept exactly as they were received, so a client
+running with decode_message=False still hands out the raw wire bytes.
+'''
+
+# The encoding request/response is always exchanged in binary, whatever
+# encoding is being negotiated: Size, Type, ProtocolVersion, Encoding, ProtocolType
+ENCODING_LAYOUT = struct.Struct('<HHii4s')
+
+def EncodingRequest(encoding):
+    return ENCODING_LAYOUT.pack(ENCODING_LAYOUT.size, DTC.ENCODING_REQUEST,
+                                DTC.CURRENT_VERSION, encoding, b'DTC\x00')
+
+def ParseEncodingResponse(res):
+    size, _type, version, encoding, protocol = ENCODING_LAYOUT.unpack(res)
+    if _type != DTC.ENCODING_RESPONSE or protocol != b'DTC\x00':
+        raise RuntimeError("Unexpected encoding response: %r" % res)
+    return encoding
+
+
+'''
+JSON backends. loads() takes any bytes-like object (frames may be memoryviews
+into a receive buffer) and dumps() returns bytes, so neither side needs an
+intermediate str. orjson or ujson are used when installed.
+'''
+
+class JsonBackend:
+
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+def _orjson():
+    import orjson
+    return JsonBackend('orjson', orjson.loads, orjson.dumps)
+
+def _ujson():
+    import ujson
+    # ujson wants bytes or str
+    return JsonBackend('ujson',
+                       lambda buf: ujson.loads(buf if isinstance(buf, bytes) else bytes(buf)),
+                       lambda obj: ujson.dumps(obj).encode('utf-8'))
+
+def _stdlib():
+    # json.loads takes bytes and bytearray but not memoryview
+    return JsonBackend('json',
+                       lambda buf: json.loads(buf if isinstance(buf, (bytes, bytearray)) else bytes(buf)),
+                       lambda obj: json.dumps(obj).encode('utf-8'))
+
+JSON_BACKENDS = {
+    'orjson': _orjson,
+    'ujson': _ujson,
+    'json': _stdlib,
+}
+
+def LoadJsonBackend(name = None):
+    # name=None picks the first backend that is installed
+    if name is not None:
+        return JSON_BACKENDS[name]()
+    for factory in JSON_BACKENDS.values():
+        try:
+            return factory()
+        except ImportError:
+            pass
+
+JSON = LoadJsonBackend()
+
+
+class JsonCodec:
+
+    ENCODING = DTC.JSON_ENCODING
+    # "Type" is the first member in practice, so this rarely scans far
+    TYPE_PATTERN = re.compile(rb'"Type"\s*:\s*(\d+)')
+
+    def __init__(self, backend = None):
+        self.json = backend or JSON
+
+    def message_type(self, frame):
+        # type of a frame without decoding it, None if it can't be found
+        match = self.TYPE_PATTERN.search(frame)
+        return int(match.group(1)) if match else None
+
+    def encode(self, obj):
+        return self.json.dumps(obj) + b'\x00'
+
+    def decode(self, frame):
+        # frame still carries its null terminator, and may be a memoryview
+        return self.json.loads(frame[:-1])
+
+    async def read_frame(self, reader):
+        return await reader.readuntil(b'\x00')
+
+    def split(self, buf, view, start, end):
+        frames = []
+        index = buf.find(b'\x00', start, end)
+        while index != -1:
+            frames.append(view[start : index + 1])
+            start = index + 1
+            index = buf.find(b'\x00', start, end)
+        return frames, start
+
+
+class JsonCompactCodec(JsonCodec):
+
+    '''
+    Compact JSON carries the fields of a message positionally, in proto field
+    order: {"Type": 107, "F": [1, 2, 4500.25, 3, 1616000000.5]}
+    '''
+
+    ENCODING = DTC.JSON_COMPACT_ENCODING
+
+    def __init__(self, backend = None):
+        super().__init__(backend)
+        self.fields = DTC.MESSAGE_FIELDS
+
+    def encode(self, obj):
+        fields = self.fields.get(obj['Type'])
+        if fields is None:
+            raise ValueError("No field table for message type %d" % obj['Type'])
+        values = [obj.get(name, default) for name, default in fields]
+        # trailing unset fields can be left out
+        while values and values[-1] == fields[len(values) - 1][1]:
+            values.pop()
+        return self.json.dumps({'Type': obj['Type'], 'F': values}) + b'\x00'
+
+    def decode(self, frame):
+        obj = self.json.loads(frame[:-1])
+        fields = self.fields.get(obj['Type'])
+        msg = {'Type': obj['Type']}
+        if fields is not None:
+            for (name, _), value in zip(fields, obj.get('F', ())):
+                msg[name] = value
+        return msg
+
+
+'''
+Fixed layouts of the binary encoding, following the natural (8 byte packed)
+alignment of the structs in DTCProtocol.h. Every frame starts with a uint16 Size
+covering the whole frame and a uint16 Type.
+
+Decoders skip the Size field, so the unpacked tuple lines up with the field
+names starting at 'Type'. Messages without a layout here are decoded to just
+{'Type': ...}.
+'''
+
+def _layout(fmt, *fields):
+    return struct.Struct('<2xH' + fmt), ('Type',) + fields
+
+BINARY_DECODERS = {
+    DTC.HEARTBEAT: _layout('Iq', 'NumDroppedMessages', 'CurrentDateTime'),
+    DTC.ENCODING_RESPONSE: _layout('ii4x', 'ProtocolVersion', 'Encoding'),
+    DTC.MARKET_DATA_UPDATE_TRADE: _layout(
+        'IH6xddd', 'SymbolID', 'AtBidOrAsk', 'Price', 'Volume', 'DateTime'),
+    DTC.MARKET_DATA_UPDATE_TRADE_COMPACT: _layout(
+        'ffIIH2x', 'Price', 'Volume', 'DateTime', 'SymbolID', 'AtBidOrAsk'),
+    DTC.MARKET_DATA_UPDATE_BID_ASK: _layout(
+        'Idf4xdfI', 'SymbolID', 'BidPrice', 'BidQuantity', 'AskPrice', 'AskQuantity', 'DateTime'),
+    DTC.MARKET_DATA_UPDATE_BID_ASK_COMPACT: _layout(
+        'ffffII', 'BidPrice', 'BidQuantity', 'AskPrice', 'AskQuantity', 'DateTime', 'SymbolID'),
+    DTC.MARKET_DEPTH_UPDATE_LEVEL: _layout(
+        'IH6xddB7xdI4x', 'SymbolID', 'Side', 'Price', 'Quantity', 'UpdateType', 'DateTime', 'NumOrders'),
+    DTC.MARKET_DEPTH_UPDATE_LEVEL_FLOAT_WITH_MILLISECONDS: _layout(
+        'IqffbbHB3x', 'SymbolID', 'DateTime', 'Price', 'Quantity', 'Side', 'UpdateType',
+        'NumOrders', 'FinalUpdateInBatch'),
+    DTC.MARKET_DEPTH_UPDATE_LEVEL_NO_TIMESTAMP: _layout(
+        'IffHbbB3x', 'SymbolID', 'Price', 'Quantity', 'NumOrders', 'Side', 'UpdateType',
+        'FinalUpdateInBatch'),
+    DTC.MARKET_DEPTH_SNAPSHOT_LEVEL: _layout(
+        'IH6xddHBB4xdI4x', 'SymbolID', 'Side', 'Price', 'Quantity', 'Level',
+        'IsFirstMessageInBatch', 'IsLastMessageInBatch', 'DateTime', 'NumOrders'),
+}
+
+# Encoders include Size, which is filled in from the layout. 's' fields are
+# fixed length, null padded strings and default to empty, everything else to 0.
+def _request(fmt, *fields):
+    defaults = []
+    for count, code in re.findall(r'(\d*)([a-zA-Z?])', fmt):
+        if code == 's':
+            defaults.append(b'')
+        elif code != 'x':
+            defaults.extend([0] * int(count or 1))
+    assert(len(defaults) == len(fields))
+    return struct.Struct('<HH' + fmt), ('Type',) + fields, tuple(defaults)
+
+BINARY_ENCODERS = {
+    DTC.HEARTBEAT: _request('Iq', 'NumDroppedMessages', 'CurrentDateTime'),
+    DTC.LOGON_REQUEST: _request(
+        'i32s32s64siiii32s64s48si', 'ProtocolVersion', 'Username', 'Password', 'GeneralTextData',
+        'Integer_1', 'Integer_2', 'HeartbeatIntervalInSeconds', 'TradeMode', 'TradeAccount',
+        'HardwareIdentifier', 'ClientName', 'MarketDataTransmissionInterval'),
+    DTC.LOGOFF: _request('96sB1x', 'Reason', 'DoNotReconnect'),
+    DTC.MARKET_DATA_REQUEST: _request(
+        'iI64s16sI', 'RequestAction', 'SymbolID', 'Symbol', 'Exchange',
+        'IntervalForSnapshotUpdatesInMilliseconds'),
+    DTC.MARKET_DEPTH_REQUEST: _request(
+        'iI64s16si', 'RequestAction', 'SymbolID', 'Symbol', 'Exchange', 'NumLevels'),
+}
+
+
+class LengthPrefixedCodec:
+
+    # Size (whole frame, header included) and Type
+    HEADER = struct.Struct('<HH')
+
+    async def read_frame(self, reader):
+        header = await reader.readexactly(2)
+        size = int.from_bytes(header, byteorder='little')
+        return header + await reader.readexactly(size - 2)
+
+    def message_type(self, frame):
+        return self.HEADER.unpack_from(frame)[1]
+
+    def split(self, buf, view, start, end):
+        frames = []
+        while end - start >= 2:
+            size = buf[start] | buf[start + 1] << 8
+            if size < self.HEADER.size:
+                raise ValueError("Invalid frame size %d" % size)
+            if end - start < size:
+                break
+            frames.append(view[start : start + size])
+            start += size
+        return frames, start
+
+
+class BinaryCodec(LengthPrefixedCodec):
+
+    ENCODING = DTC.BINARY_ENCODING
+
+    def encode(self, obj):
+        try:
+            layout, fields, defaults = BINARY_ENCODERS[obj['Type']]
+        except KeyError:
+            raise ValueError("No binary layout for message type %d" % obj['Type'])
+        values = [layout.size, obj['Type']]
+        for field, default in zip(fields[1:], defaults):
+            value = obj.get(field, default)
+            values.append(value.encode('ascii') if isinstance(value, str) else value)
+        return layout.pack(*values)
+
+    def decode(self, frame):
+        _type = self.HEADER.unpack_from(frame)[1]
+        layout = BINARY_DECODERS.get(_type)
+        if layout is None:
+            return {'Type': _type}
+        layout, fields = layout
+        if len(frame) < layout.size:
+            # senders may leave out trailing fields (eg. an older protocol
+            # version), they are zero
+            frame = bytes(frame).ljust(layout.size, b'\x00')
+        return dict(zip(fields, layout.unpack_from(frame)))
+
+
+class ProtobufCodec(LengthPrefixedCodec):
+
+    ENCODING = DTC.PROTOCOL_BUFFERS
+
+    def __init__(self):
+        # the generated protobuf module is only loaded when this encoding is used
+        import DTCProtocol_pb2
+        self.classes = {t: getattr(DTCProtocol_pb2, name) for t, name in DTC.MESSAGE_NAMES.items()}
+        self.fields = {t: tuple(name for name, _ in fields) for t, fields in DTC.MESSAGE_FIELDS.items()}
+        # one instance per type, reused for every frame of that type
+        self.pool = {}
+
+    def parse(self, frame):
+        # Returns the pooled message instance for the frame's type. It is only
+        # valid until the next frame of the same type is parsed.
+        _type = self.HEADER.unpack_from(frame)[1]
+        msg = self.pool.get(_type)
+        if msg is None:
+            cls = self.classes.get(_type)
+            if cls is None:
+                return _type, None
+            msg = self.pool[_type] = cls()
+        msg.ParseFromString(frame[self.HEADER.size:])
+        return _type, msg
+
+    def decode(self, frame):
+        _type, msg = self.parse(frame)
+        obj = {'Type': _type}
+        if msg is not None:
+            for field in self.fields[_type]:
+                obj[field] = getattr(msg, field)
+        return obj
+
+    def encode(self, obj):
+        cls = self.classes.get(obj['Type'])
+        if cls is None:
+            raise ValueError("No protobuf message for message type %d" % obj['Type'])
+        msg = cls(**{k: v for k, v in obj.items() if k != 'Type'})
+        payload = msg.SerializeToString()
+        return self.HEADER.pack(self.HEADER.size + len(payload), obj['Type']) + payload
+
+
+class FrameBuffer:
+
+    '''
+    Receive buffer that is filled in place by sock.recv_into (or a buffered
+    protocol, see DTCTransport.py) and split into frames in one pass. Frames are memoryviews into the buffer, they stay valid
+    until the next call to recv_into/feed. Only an incomplete trailing frame is
+    ever moved, to the front of the buffer, when the buffer runs out of room.
+    '''
+
+    def __init__(self, codec, size = 1 << 16):
+        self.codec = codec
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.start = 0
+        self.end = 0
+
+    def _make_room(self, needed):
+        pending = self.end - self.start
+        if pending + needed > len(self.buf):
+            # a frame larger than the buffer, grow it
+            size = len(self.buf)
+            while pending + needed > size:
+                size *= 2
+            buf = bytearray(size)
+            buf[:pending] = self.view[self.start:self.end]
+            self.buf = buf
+            self.view = memoryview(buf)
+        elif pending:
+            self.buf[:pending] = bytes(self.view[self.start:self.end])
+        self.start = 0
+        self.end = pending
+
+    def reserve(self):
+        # the free tail of the buffer to receive into, see received()
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif self.end == len(self.buf):
+            self._make_room(1)
+        return self.view[self.end:]
+
+    def received(self, n):
+        self.end += n
+
+    def recv_into(self, sock):
+        n = sock.recv_into(self.reserve())
+        self.end += n
+        return n
+
+    def feed(self, data):
+        if self.start == self.end:
+            self.start = self.end = 0
+        if self.end + len(data) > len(self.buf):
+            self._make_room(len(data))
+        self.view[self.end : self.end + len(data)] = data
+        self.end += len(data)
+
+    def take(self, n):
+        # the next n bytes as they are, or None until they have been received
+        if self.end - self.start < n:
+            return None
+        data = bytes(self.view[self.start : self.start + n])
+        self.start += n
+        return data
+
+    def frames(self):
+        frames, self.start = self.codec.split(self.buf, self.view, self.start, self.end)
+        return frames
+
+
+CODECS = {
+    DTC.JSON_ENCODING: JsonCodec,
+    DTC.JSON_COMPACT_ENCODING: JsonCompactCodec,
+    DTC.BINARY_ENCODING: BinaryCodec,
+    DTC.PROTOCOL_BUFFERS: ProtobufCodec,
+}
+
+def CreateCodec(encoding):
+    if encoding not in CODECS:
+        raise ValueError("Unsupported encoding: %d" % encoding)
+    return CODECS[encoding]()
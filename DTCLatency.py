@@ -0,0 +1,162 @@
+import DTCConstants as DTC
+from math import frexp
+
+'''
+Exchange to receive latency of market data messages.
+
+Every message with an embedded timestamp is compared with the local time its
+frame was received at, and the difference recorded in log bucketed (HDR style)
+histograms per message type and per (type, SymbolID). Latencies are on the
+local clock, so they include the local clock's error; negative ones (local
+clock behind) are only counted. Messages with whole second timestamps (the
+compact trade and bid/ask messages) give whole second resolution.
+
+    client = DTCClientAsync(latency=True)
+    ...
+    tables = client.latency.snapshot(reset=True)
+    tables[DTC.MARKET_DEPTH_UPDATE_LEVEL].summary()
+'''
+
+# type -> (timestamp field, seconds per unit)
+TIMESTAMPS = {
+    DTC.MARKET_DATA_UPDATE_TRADE: ('DateTime', 1),
+    DTC.MARKET_DATA_UPDATE_TRADE_COMPACT: ('DateTime', 1),
+    DTC.MARKET_DATA_UPDATE_TRADE_WITH_UNBUNDLED_INDICATOR: ('DateTime', 1),
+    DTC.MARKET_DATA_UPDATE_TRADE_WITH_UNBUNDLED_INDICATOR_2: ('DateTime', 1e-6),
+    DTC.MARKET_DATA_UPDATE_BID_ASK: ('DateTime', 1),
+    DTC.MARKET_DATA_UPDATE_BID_ASK_COMPACT: ('DateTime', 1),
+    DTC.MARKET_DEPTH_UPDATE_LEVEL: ('DateTime', 1),
+    DTC.MARKET_DEPTH_UPDATE_LEVEL_FLOAT_WITH_MILLISECONDS: ('DateTime', 1e-3),
+}
+
+class LatencyHistogram:
+
+    # SUB_BUCKETS linear buckets per power of two microseconds, so a value is
+    # known to within 1/SUB_BUCKETS; anything below 1us is in the first bucket
+    SUB_BUCKETS = 16
+    EXPONENTS = 40
+
+    def __init__(self):
+        self.counts = [0] * (self.EXPONENTS * self.SUB_BUCKETS)
+        self.count = 0
+        self.negative = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds < 0:
+            self.negative += 1
+            return
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        mantissa, exponent = frexp(seconds * 1e6)
+        index = (exponent - 1) * self.SUB_BUCKETS + int((mantissa * 2 - 1) * self.SUB_BUCKETS)
+        self.counts[min(max(index, 0), len(self.counts) - 1)] += 1
+
+    def value(self, index):
+        # upper bound of a bucket, in seconds
+        exponent, sub = divmod(index, self.SUB_BUCKETS)
+        return (1 + (sub + 1) / self.SUB_BUCKETS) * 2 ** exponent / 1e6
+
+    def percentile(self, p):
+        if self.count == 0:
+            return None
+        target = self.count * p / 100
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= target:
+                return min(self.value(index), self.max)
+        return self.max
+
+    def merge(self, other):
+        for index, n in enumerate(other.counts):
+            if n:
+                self.counts[index] += n
+        self.count += other.count
+        self.negative += other.negative
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def copy(self):
+        hist = LatencyHistogram()
+        hist.merge(self)
+        return hist
+
+    def summary(self):
+        # seconds
+        return {
+            'count': self.count,
+            'negative': self.negative,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p99.9': self.percentile(99.9),
+            'max': self.max if self.count else None,
+        }
+
+
+class LatencyRecorder:
+
+    def __init__(self, per_symbol = True, timestamps = TIMESTAMPS):
+        self.per_symbol = per_symbol
+        self.timestamps = timestamps
+        # type -> histogram, (type, SymbolID) -> histogram
+        self.tables = {}
+
+    def record(self, message, received):
+        # received is the local time.time() the message's frame arrived at
+        _type = message['Type']
+        spec = self.timestamps.get(_type)
+        if spec is None:
+            return
+        field, scale = spec
+        timestamp = message.get(field)
+        if not timestamp:
+            return
+        latency = received - timestamp * scale
+
+        tables = self.tables
+        hist = tables.get(_type)
+        if hist is None:
+            hist = tables[_type] = LatencyHistogram()
+        hist.record(latency)
+        if self.per_symbol:
+            key = (_type, message.get('SymbolID'))
+            hist = tables.get(key)
+            if hist is None:
+                hist = tables[key] = LatencyHistogram()
+            hist.record(latency)
+
+    def snapshot(self, reset = False):
+        # {type or (type, SymbolID): LatencyHistogram}; with reset the live
+        # tables are handed over as they are and recording starts afresh
+        if reset:
+            tables, self.tables = self.tables, {}
+            return tables
+        return {key: hist.copy() for key, hist in list(self.tables.items())}
+
+    def reset(self):
+        self.tables = {}
+
+    def report(self, tables = None):
+        tables = self.snapshot() if tables is None else tables
+        print('%-44s %8s %8s %10s %10s %10s %10s' % ('type', 'SymbolID', 'count', 'p50 ms', 'p99 ms', 'p99.9 ms', 'max ms'))
+        def order(key):
+            # per type first, then its symbols; SymbolID may be None
+            if not isinstance(key, tuple):
+                return (key, 0, 0)
+            return (key[0], 1, -1 if key[1] is None else key[1])
+
+        for key in sorted(tables, key=order):
+            hist = tables[key]
+            if not hist.count:
+                continue
+            _type, symbol_id = key if isinstance(key, tuple) else (key, '')
+            s = hist.summary()
+            print('%-44s %8s %8d %10.3f %10.3f %10.3f %10.3f' % (
+                DTC.MESSAGE_NAMES.get(_type, _type), symbol_id, s['count'],
+                s['p50'] * 1e3, s['p99'] * 1e3, s['p99.9'] * 1e3, s['max'] * 1e3))
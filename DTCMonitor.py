@@ -0,0 +1,119 @@
+import socket
+import struct
+import time
+from termcolor import colored
+
+'''
+Link health of a client connection.
+
+  rtt           the kernel's smoothed round trip time of the TCP connection
+                (TCP_INFO, Linux only, otherwise None), and its variation
+  clock_offset  server clock minus local clock, estimated from the server's
+                heartbeat CurrentDateTime and the local receive time less half
+                the round trip; CurrentDateTime has whole seconds only, so
+                this is smoothed over many heartbeats
+  stale         no data received for stale_after seconds
+
+DTC heartbeats are not answered, so the round trip comes from TCP rather than
+from heartbeat timing. Heartbeats are only sent once nothing else has been
+sent for the heartbeat interval.
+'''
+
+# struct tcp_info up to tcpi_rttvar: 8 one byte fields, then u32 fields of
+# which rtt and rttvar (microseconds) are the 16th and 17th
+TCP_INFO_LAYOUT = struct.Struct('8B17I')
+
+def TcpRtt(sock):
+    # (rtt, rttvar) in seconds, or None where TCP_INFO is not available
+    if sock is None or not hasattr(socket, 'TCP_INFO'):
+        return None
+    try:
+        info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, TCP_INFO_LAYOUT.size)
+    except OSError:
+        return None
+    fields = TCP_INFO_LAYOUT.unpack(info[:TCP_INFO_LAYOUT.size])
+    return fields[23] / 1e6, fields[24] / 1e6
+
+
+class LinkMonitor:
+
+    # seconds between checks, see check()
+    CHECK_INTERVAL = 1
+    # weight of the newest clock offset sample
+    OFFSET_ALPHA = 0.1
+
+    def __init__(self, stale_after = None, on_stale = None):
+        # on_stale(monitor) is called when the feed turns stale and again when
+        # data arrives after that, see .stale
+        self.stale_after = stale_after
+        self.on_stale = on_stale
+        now = time.monotonic()
+        self.last_receive = now
+        # time.time() of the last receive, for comparing with timestamps
+        self.received_at = time.time()
+        self.last_send = now
+        self.stale = False
+        self.rtt = None
+        self.rttvar = None
+        self.clock_offset = None
+        self.heartbeats = 0
+        self.dropped = 0
+
+    def received(self):
+        self.last_receive = time.monotonic()
+        self.received_at = time.time()
+
+    def sent(self):
+        self.last_send = time.monotonic()
+
+    def heartbeat(self, message):
+        # a server heartbeat, as it is received
+        self.heartbeats += 1
+        self.dropped = message.get('NumDroppedMessages', 0)
+        server_time = message.get('CurrentDateTime')
+        if not server_time:
+            return
+        # CurrentDateTime is truncated to the second, +0.5 to center it
+        local_time = time.time() - (self.rtt or 0) / 2
+        sample = server_time + 0.5 - local_time
+        if self.clock_offset is None:
+            self.clock_offset = sample
+        else:
+            self.clock_offset += self.OFFSET_ALPHA * (sample - self.clock_offset)
+
+    def server_time(self, local_time = None):
+        # local_time (default now) on the server's clock
+        local_time = time.time() if local_time is None else local_time
+        return local_time + (self.clock_offset or 0)
+
+    def check(self, sock, heartbeat_interval):
+        # Called every CHECK_INTERVAL seconds: samples the round trip and
+        # updates staleness. Returns True if a heartbeat is due.
+        rtt = TcpRtt(sock)
+        if rtt is not None:
+            self.rtt, self.rttvar = rtt
+
+        now = time.monotonic()
+        if self.stale_after is not None:
+            stale = now - self.last_receive > self.stale_after
+            if stale != self.stale:
+                self.stale = stale
+                if stale:
+                    print(colored("Feed stale, nothing received for %.1fs" % (now - self.last_receive), 'yellow'))
+                else:
+                    print(colored("Feed resumed", 'green'))
+                if self.on_stale is not None:
+                    self.on_stale(self)
+
+        return now - self.last_send >= heartbeat_interval
+
+    def status(self):
+        return {
+            'rtt': self.rtt,
+            'rttvar': self.rttvar,
+            'clock_offset': self.clock_offset,
+            'idle': time.monotonic() - self.last_receive,
+            'stale': self.stale,
+            'heartbeats': self.heartbeats,
+            'dropped': self.dropped,
+        }
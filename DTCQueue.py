@@ -0,0 +1,257 @@
+import DTCConstants as DTC
+import asyncio as aio
+import queue
+from collections import deque
+
+'''
+Bounded message queues for the clients, with a choice of what happens when the
+consumer falls behind and the queue is full:
+
+  block        the producer waits for room (socket reads stall)
+  drop-oldest  the oldest queued message is dropped to make room
+  drop-newest  the incoming message is dropped
+  conflate     a message with a conflation key replaces the queued message
+               with the same key, wherever it is in the queue; new keys and
+               messages without a key wait for room as with block
+
+Dropped and conflated messages are counted in .dropped and .conflated. The end
+of stream marker (b'') is never dropped and never waits, it is queued past
+maxsize. With maxsize=0 the queue is unbounded and only conflation applies.
+'''
+
+BLOCK = 'block'
+DROP_OLDEST = 'drop-oldest'
+DROP_NEWEST = 'drop-newest'
+CONFLATE = 'conflate'
+
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, CONFLATE)
+
+END = b''
+
+DEPTH_UPDATE_TYPES = {
+    DTC.MARKET_DEPTH_UPDATE_LEVEL,
+    DTC.MARKET_DEPTH_UPDATE_LEVEL_FLOAT_WITH_MILLISECONDS,
+    DTC.MARKET_DEPTH_UPDATE_LEVEL_NO_TIMESTAMP,
+}
+
+BID_ASK_TYPES = {
+    DTC.MARKET_DATA_UPDATE_BID_ASK,
+    DTC.MARKET_DATA_UPDATE_BID_ASK_COMPACT,
+    DTC.MARKET_DATA_UPDATE_BID_ASK_NO_TIMESTAMP,
+}
+
+def ConflationKey(message):
+    # depth updates conflate per price level, bid/ask updates per symbol
+    _type = message.get('Type')
+    if _type in DEPTH_UPDATE_TYPES:
+        return (DTC.MARKET_DEPTH_UPDATE_LEVEL, message.get('SymbolID'), message['Side'], message['Price'])
+    if _type in BID_ASK_TYPES:
+        return (DTC.MARKET_DATA_UPDATE_BID_ASK, message.get('SymbolID'))
+    return None
+
+
+class _Overflow:
+
+    # Storage shared by both queues: a deque of (key, message) in arrival
+    # order. Conflatable messages are queued as (key, None) and their latest
+    # version lives in self.latest.
+
+    def _setup(self, policy, key):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError("Unknown overflow policy: %s" % policy)
+        self.policy = policy
+        self.key = key if policy == CONFLATE else None
+        self.dropped = 0
+        self.conflated = 0
+
+    def _init(self, maxsize):
+        # queue.Queue and asyncio.Queue name their storage differently
+        self.queue = self._queue = deque()
+        self.latest = {}
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, item):
+        key = self._key(item)
+        if key is None:
+            self.queue.append((None, item))
+        elif key in self.latest:
+            self.latest[key] = item
+            self.conflated += 1
+        else:
+            self.latest[key] = item
+            self.queue.append((key, None))
+
+    def _get(self):
+        key, item = self.queue.popleft()
+        return item if key is None else self.latest.pop(key)
+
+    def _key(self, item):
+        if self.key is None or not isinstance(item, dict):
+            return None
+        return self.key(item)
+
+    def _conflate(self, item):
+        key = self._key(item)
+        if key is not None and key in self.latest:
+            self.latest[key] = item
+            self.conflated += 1
+            return True
+        return False
+
+    def _make_room(self, item):
+        # returns False if item should be dropped instead
+        if self.policy == DROP_NEWEST:
+            self.dropped += 1
+            return False
+        self._get()
+        self.dropped += 1
+        return True
+
+
+class AsyncMessageQueue(_Overflow, aio.Queue):
+
+    def __init__(self, maxsize=0, policy=BLOCK, key=ConflationKey):
+        self._setup(policy, key)
+        super().__init__(maxsize)
+
+    def put_nowait(self, item):
+        if item == END:
+            self._put_end()
+            return
+        if self._conflate(item):
+            return
+        if self.full() and self.policy in (DROP_OLDEST, DROP_NEWEST):
+            if not self._make_room(item):
+                return
+        super().put_nowait(item)
+
+    async def put(self, item):
+        if item == END or self.policy in (DROP_OLDEST, DROP_NEWEST):
+            self.put_nowait(item)
+        elif not self._conflate(item):
+            await super().put(item)
+
+    def _put_end(self):
+        # as aio.Queue.put_nowait, without the full() check: the consumer may
+        # be the one ending the stream, eg. close() from inside messages()
+        self._put(END)
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._wakeup_next(self._getters)
+
+
+class MessageQueue(_Overflow, queue.Queue):
+
+    def __init__(self, maxsize=0, policy=BLOCK, key=ConflationKey):
+        self._setup(policy, key)
+        super().__init__(maxsize)
+
+    def put(self, item, block=True, timeout=None):
+        if self.policy == CONFLATE:
+            with self.mutex:
+                if self._conflate(item):
+                    return
+        if self.policy in (BLOCK, CONFLATE) and item != END:
+            return super().put(item, block, timeout)
+        with self.mutex:
+            # the end of stream marker goes past maxsize
+            if item != END and 0 < self.maxsize <= self._qsize() and not self._make_room(item):
+                return
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+
+DEPTH_SNAPSHOT_TYPES = {
+    DTC.MARKET_DEPTH_SNAPSHOT_LEVEL,
+    DTC.MARKET_DEPTH_SNAPSHOT_LEVEL_FLOAT,
+}
+
+class ConflatingDepthChannel:
+
+    '''
+    Hands depth messages to a lagging consumer as merged sets, keeping only
+    the latest message per (SymbolID, Side, Price) between reads.
+
+    Messages of a batch (FinalUpdateInBatch FALSE/BEGIN_BATCH up to TRUE, or
+    snapshot levels up to IsLastMessageInBatch) are merged into what the
+    consumer sees only once the batch is complete, so every get() returns a
+    consistent book state. Batches are per SymbolID, a symbol's batch is only
+    held back by its own messages. Messages without batch flags are complete
+    on their own. The first snapshot level of a batch resets the symbol, it
+    discards whatever was pending for it and is never conflated away.
+    '''
+
+    def __init__(self):
+        # merged, complete batches waiting for the consumer
+        self.pending = {}
+        # SymbolID -> the batch being received for it
+        self.batches = {}
+        self.ready = aio.Event()
+        self.closed = False
+        self.conflated = 0
+
+    def put(self, message):
+        # returns False for messages that are not depth messages
+        _type = message['Type']
+        symbol_id = message.get('SymbolID')
+        batch = self.batches.get(symbol_id)
+
+        if _type in DEPTH_UPDATE_TYPES:
+            final = message.get('FinalUpdateInBatch', DTC.FINAL_UPDATE_UNSET)
+            complete = final in (DTC.FINAL_UPDATE_UNSET, DTC.FINAL_UPDATE_TRUE)
+            key = (symbol_id, message['Side'], message['Price'])
+        elif _type in DEPTH_SNAPSHOT_TYPES:
+            if message.get('IsFirstMessageInBatch') or \
+               message.get('FinalUpdateInBatch') == DTC.FINAL_UPDATE_BEGIN_BATCH:
+                # whatever was received of the symbol's batch is superseded
+                batch = None
+                key = ('reset', symbol_id)
+            else:
+                key = (symbol_id, message.get('Side'), message.get('Price'))
+            if 'IsLastMessageInBatch' in message:
+                complete = bool(message['IsLastMessageInBatch'])
+            else:
+                complete = message.get('FinalUpdateInBatch') == DTC.FINAL_UPDATE_TRUE
+        else:
+            return False
+
+        if batch is None:
+            batch = self.batches[symbol_id] = {}
+        elif key in batch:
+            self.conflated += 1
+        batch[key] = message
+
+        if complete:
+            self._commit(symbol_id)
+        return True
+
+    def _reset(self, table, symbol_id):
+        for key in [k for k in table if k[0] == symbol_id or k == ('reset', symbol_id)]:
+            del table[key]
+
+    def _commit(self, symbol_id):
+        for key, message in self.batches.pop(symbol_id).items():
+            if key[0] == 'reset':
+                self._reset(self.pending, key[1])
+            elif key in self.pending:
+                self.conflated += 1
+            self.pending[key] = message
+        if self.pending:
+            self.ready.set()
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+
+    async def get(self):
+        # the merged set of messages since the last get(), [] once closed
+        while not self.pending:
+            if self.closed:
+                return []
+            self.ready.clear()
+            await self.ready.wait()
+        pending, self.pending = self.pending, {}
+        return list(pending.values())
@@ -0,0 +1,683 @@
+import DTCConstants as DTC
+from DTCEncoding import CreateCodec, JSON
+from DTCLatency import TIMESTAMPS
+import asyncio as aio
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+'''
+Group commit log writer for the DTCClient.py recorder.
+
+Records are collected in memory and committed to the file together once
+max_bytes have accumulated or max_delay seconds after the first of them,
+whichever comes first. Commits are written, one at a time and in order, by a
+background thread, so the event loop never waits for the disk unless more than
+max_pending commits are outstanding. close() commits what is left.
+
+durability says what a finished commit survives:
+
+  os     the data has been handed to the operating system, it survives the
+         recorder crashing but not the machine
+  fsync  the file has also been fsync'ed, it survives a power loss; costs a
+         disk flush per commit
+
+    writer = GroupCommitWriter('current.log')
+    await writer.write(line)
+    ...
+    await writer.close()
+
+Raw logs (--raw) hold the frames exactly as received, each with the time it
+was received, so recording costs no decoding at all. After a 16 byte header
+(RAW_MAGIC, the encoding) every record is
+
+    received time (float64 seconds), frame length (uint32), frame
+
+little endian. ReadRaw()/DecodeRaw() read them back, and
+
+    python3 DTCRecorder.py decode -i raw.log -o current.log
+
+turns one into the JSON lines log the other tools read.
+
+RotatingLog splits a log into segments, a new one every trading session
+(starting at session_start, local or timezone time), every wall clock hour or
+once a segment reaches max_size bytes. Segments are named <log>.<opened at>
+and listed in <log>.manifest with their kind, symbols, first/last message
+timestamps (receive times for raw logs), record count and size; Segments() picks those covering a time
+range. A segment's manifest entry is completed when it is closed, the one
+being written has 'closed' None.
+
+Compressed logs (--compress zlib, or zstd with the zstandard package) are
+written by BlockWriter as blocks of whole records, each compressed on its
+own, so a block can be read without the ones before it:
+
+    file header  BLOCK_MAGIC, compression, size of the log's own header
+    block        BLOCK_HEADER (compressed and original size, record count,
+                 first and last timestamp), compressed records
+
+The log's own header (eg. a raw log's) is at the start of the first block.
+<log>.index lists every block's offset and BLOCK_HEADER, so BlockIndex()
+needs no reads of the log itself; blocks missing from it (after a crash) are
+found by scanning. ReadBlocks() decompresses only the blocks holding a time
+range, several at once, and
+
+    python3 DTCRecorder.py decompress -i current.log -o plain.log
+
+restores the uncompressed log.
+'''
+
+OS = 'os'
+FSYNC = 'fsync'
+
+DURABILITY = (OS, FSYNC)
+
+SIZE = 'size'
+HOUR = 'hour'
+SESSION = 'session'
+
+ROTATIONS = (SIZE, HOUR, SESSION)
+
+# log kinds, as listed in manifests
+JSON_LINES = 'json'
+RAW = 'raw'
+
+MANIFEST_SUFFIX = '.manifest'
+
+ZLIB = 'zlib'
+ZSTD = 'zstd'
+
+COMPRESSIONS = (ZLIB, ZSTD)
+
+BLOCK_MAGIC = b'DTCBLK\x00\x01'
+# magic, compression id, size of the log's own header
+BLOCK_FILE_HEADER = struct.Struct('<8sB3xI')
+# compressed size, original size, records, first and last timestamp (NaN if
+# unknown)
+BLOCK_HEADER = struct.Struct('<III4xdd')
+# offset of the block, then its BLOCK_HEADER
+BLOCK_INDEX_ENTRY = struct.Struct('<Q' + BLOCK_HEADER.format[1:])
+INDEX_SUFFIX = '.index'
+
+COMPRESSION_IDS = {ZLIB: 1, ZSTD: 2}
+
+# type -> (timestamp field, seconds per unit)
+TIMES = dict(TIMESTAMPS)
+TIMES[DTC.MARKET_DEPTH_SNAPSHOT_LEVEL] = ('DateTime', 1)
+
+def MessageTime(message, default):
+    # the message's own timestamp in seconds, default if it has none
+    spec = TIMES.get(message.get('Type'))
+    if spec is not None:
+        timestamp = message.get(spec[0])
+        if timestamp:
+            return timestamp * spec[1]
+    return default
+
+RAW_MAGIC = b'DTCRAW\x00\x01'
+RAW_HEADER = struct.Struct('<8si4x')
+RAW_RECORD = struct.Struct('<dI')
+
+def RawHeader(encoding):
+    return RAW_HEADER.pack(RAW_MAGIC, encoding)
+
+def RawRecord(received_at, frame):
+    # DTCClientAsync(decode_message=False, raw_record=RawRecord) queues these
+    return RAW_RECORD.pack(received_at, len(frame)) + frame
+
+def ReadRaw(path):
+    # (encoding, generator of (received time, frame))
+    with open(path, 'rb') as f:
+        header = f.read(RAW_HEADER.size)
+    magic, encoding = RAW_HEADER.unpack(header)
+    if magic != RAW_MAGIC:
+        raise ValueError("%s is not a raw DTC log" % path)
+    return encoding, _RawRecords(path)
+
+def _RawRecords(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= RAW_HEADER.size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            view = memoryview(data)
+            offset = RAW_HEADER.size
+            # a record cut short by a crash ends the log
+            while offset + RAW_RECORD.size <= len(view):
+                received_at, size = RAW_RECORD.unpack_from(view, offset)
+                offset += RAW_RECORD.size
+                if offset + size > len(view):
+                    break
+                yield received_at, bytes(view[offset : offset + size])
+                offset += size
+            view.release()
+
+def DecodeRaw(path):
+    # (received time, message dict) for every frame of a raw log
+    encoding, records = ReadRaw(path)
+    codec = CreateCodec(encoding)
+    for received_at, frame in records:
+        yield received_at, codec.decode(frame)
+
+
+class GroupCommitWriter:
+
+    def __init__(self, path, append = False, max_bytes = 1 << 16, max_delay = 0.05,
+                 durability = OS, max_pending = 64, header = b''):
+        # header is written first to a new or empty file; appending to a file
+        # that starts with another header is refused
+        if durability not in DURABILITY:
+            raise ValueError("Unknown durability: %s" % durability)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.durability = durability
+        self.max_pending = max_pending
+        # our own buffering, every commit is a single write
+        self.file = open(path, 'ab' if append else 'wb', buffering=0)
+        if self.file.tell() == 0:
+            self.file.write(header)
+        elif header:
+            with open(path, 'rb') as f:
+                if f.read(len(header)) != header:
+                    self.file.close()
+                    raise ValueError("%s was written with another format or encoding" % path)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.buffer = []
+        self.size = 0
+        self.timer = None
+        # commits handed to the writer thread and not finished yet
+        self.pending = deque()
+        self.commits = 0
+        self.written = 0
+        # the first failed commit, raised by the next write() or flush()
+        self.error = None
+
+    async def write(self, data):
+        if self.error is not None:
+            raise self.error
+        self.buffer.append(data)
+        self.size += len(data)
+        if self.size >= self.max_bytes:
+            self.commit()
+        elif self.timer is None:
+            self.timer = aio.get_running_loop().call_later(self.max_delay, self.commit)
+        if len(self.pending) > self.max_pending:
+            # the disk is not keeping up, wait for the oldest commit
+            await aio.wait([self.pending[0]])
+
+    async def write_many(self, items):
+        if self.error is not None:
+            raise self.error
+        self.buffer.extend(items)
+        self.size += sum(map(len, items))
+        if self.size >= self.max_bytes:
+            self.commit()
+        elif self.timer is None:
+            self.timer = aio.get_running_loop().call_later(self.max_delay, self.commit)
+        if len(self.pending) > self.max_pending:
+            await aio.wait([self.pending[0]])
+
+    def commit(self):
+        # hands what has been written so far to the writer thread
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.buffer:
+            return
+        data = b''.join(self.buffer)
+        self.buffer = []
+        self.size = 0
+        future = aio.get_running_loop().run_in_executor(self.executor, self._write, data)
+        future.add_done_callback(self._done)
+        self.pending.append(future)
+
+    def _write(self, data):
+        # writer thread
+        view = memoryview(data)
+        while view:
+            view = view[self.file.write(view):]
+        if self.durability == FSYNC:
+            os.fsync(self.file.fileno())
+        return len(data)
+
+    def _done(self, future):
+        self.pending.remove(future)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.error = self.error or future.exception()
+        else:
+            self.commits += 1
+            self.written += future.result()
+
+    async def flush(self):
+        # commits what has been written and waits until it is on disk
+        self.commit()
+        while self.pending:
+            await aio.wait([self.pending[-1]])
+        if self.error is not None:
+            raise self.error
+
+    async def close(self):
+        try:
+            await self.flush()
+        finally:
+            self.executor.shutdown()
+            self.file.close()
+
+
+def _Compressor(compression, level):
+    if compression == ZLIB:
+        level = 6 if level is None else level
+        return lambda data: zlib.compress(data, level)
+    if zstandard is None:
+        raise ValueError("zstd compression needs the zstandard package")
+    compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+    return compressor.compress
+
+def _Decompressor(compression_id):
+    if compression_id == COMPRESSION_IDS[ZLIB]:
+        return zlib.decompress
+    if zstandard is None:
+        raise ValueError("zstd compressed log, install the zstandard package")
+    # one per call, decompressors are not thread safe
+    return lambda data: zstandard.ZstdDecompressor().decompress(data)
+
+def _Nan(timestamp):
+    return float('nan') if timestamp is None else timestamp
+
+def IsCompressed(path):
+    with open(path, 'rb') as f:
+        return f.read(len(BLOCK_MAGIC)) == BLOCK_MAGIC
+
+def _ReadFileHeader(f):
+    magic, compression_id, header_size = BLOCK_FILE_HEADER.unpack(f.read(BLOCK_FILE_HEADER.size))
+    if magic != BLOCK_MAGIC:
+        raise ValueError("%s is not a compressed DTC log" % f.name)
+    return compression_id, header_size
+
+def BlockIndex(path):
+    # [(offset, compressed size, size, records, first, last)] of every whole
+    # block, from the index and by scanning what it is missing
+    entries = []
+    if os.path.exists(path + INDEX_SUFFIX):
+        with open(path + INDEX_SUFFIX, 'rb') as f:
+            data = f.read()
+        whole = len(data) - len(data) % BLOCK_INDEX_ENTRY.size
+        entries = list(BLOCK_INDEX_ENTRY.iter_unpack(data[:whole]))
+    file_size = os.path.getsize(path)
+    # an entry may be ahead of a block that never made it to the file
+    while entries and entries[-1][0] + BLOCK_HEADER.size + entries[-1][1] > file_size:
+        entries.pop()
+    with open(path, 'rb') as f:
+        _ReadFileHeader(f)
+        offset = entries[-1][0] + BLOCK_HEADER.size + entries[-1][1] if entries else BLOCK_FILE_HEADER.size
+        while offset + BLOCK_HEADER.size <= file_size:
+            f.seek(offset)
+            block = BLOCK_HEADER.unpack(f.read(BLOCK_HEADER.size))
+            if offset + BLOCK_HEADER.size + block[0] > file_size:
+                break
+            entries.append((offset,) + block)
+            offset += BLOCK_HEADER.size + block[0]
+    return entries
+
+def _BlockReader(path):
+    # (read(entry) -> decompressed block, size of the log's own header)
+    with open(path, 'rb') as f:
+        compression_id, header_size = _ReadFileHeader(f)
+    decompress = _Decompressor(compression_id)
+    def read(fd, entry):
+        offset, compressed_size = entry[0], entry[1]
+        return decompress(os.pread(fd, compressed_size, offset + BLOCK_HEADER.size))
+    return read, header_size
+
+def CompressedHeader(path):
+    # the log's own header, eg. RawHeader(), from the start of the first block
+    read, header_size = _BlockReader(path)
+    entries = BlockIndex(path)
+    if not header_size or not entries:
+        return b''
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return read(fd, entries[0])[:header_size]
+    finally:
+        os.close(fd)
+
+def ReadBlocks(path, start = None, end = None, workers = 2):
+    # The records of every block that may hold messages timestamped between
+    # start and end, a block at a time and in order, without the log's own
+    # header; up to workers blocks are decompressed at once.
+    read, header_size = _BlockReader(path)
+    entries = []
+    for entry in BlockIndex(path):
+        first, last = entry[4], entry[5]
+        # NaN (unknown) compares False, such blocks are always read
+        if start is not None and last < start:
+            continue
+        if end is not None and first >= end:
+            continue
+        entries.append(entry)
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for entry in entries:
+                pending.append((entry, pool.submit(read, fd, entry)))
+                while len(pending) > workers * 2:
+                    yield _Strip(*pending.popleft(), header_size)
+            while pending:
+                yield _Strip(*pending.popleft(), header_size)
+    finally:
+        os.close(fd)
+
+def _Strip(entry, future, header_size):
+    data = future.result()
+    if entry[0] == BLOCK_FILE_HEADER.size:
+        return data[header_size:]
+    return data
+
+
+class BlockWriter(GroupCommitWriter):
+
+    def __init__(self, path, append = False, max_bytes = 1 << 20, max_delay = 1.0, durability = OS,
+                 max_pending = 64, header = b'', compression = ZLIB, level = None):
+        # Every commit is a block: one is compressed once max_bytes are
+        # written or max_delay after the first record, whichever comes first.
+        # header is the log's own header, put at the start of the first block.
+        if compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression: %s" % compression)
+        self.compress = _Compressor(compression, level)
+        file_header = BLOCK_FILE_HEADER.pack(BLOCK_MAGIC, COMPRESSION_IDS[compression], len(header))
+        entries = None
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            if IsCompressed(path):
+                # drop a block cut short by a crash, it would hide the rest
+                entries = BlockIndex(path)
+                end = entries[-1][0] + BLOCK_HEADER.size + entries[-1][1] if entries else BLOCK_FILE_HEADER.size
+                os.truncate(path, end)
+                if header and entries and not CompressedHeader(path).startswith(header):
+                    raise ValueError("%s was written with another format or encoding" % path)
+        super().__init__(path, append, max_bytes, max_delay, durability, max_pending, file_header)
+        self.index = open(path + INDEX_SUFFIX, 'wb', buffering=0)
+        if entries:
+            self.index.write(b''.join(BLOCK_INDEX_ENTRY.pack(*entry) for entry in entries))
+        self.offset = self.file.tell()
+        # (records, first, last) of the blocks committed and not written yet
+        self.blocks = deque()
+        self.count = 0
+        self.first = None
+        self.last = None
+        if self.offset == BLOCK_FILE_HEADER.size and header:
+            self.buffer.append(header)
+            self.size += len(header)
+
+    def _time(self, first, last):
+        if first is not None:
+            if self.first is None or first < self.first:
+                self.first = first
+            if self.last is None or last > self.last:
+                self.last = last
+
+    async def write(self, data, timestamp = None):
+        self.count += 1
+        self._time(timestamp, timestamp)
+        await super().write(data)
+
+    async def write_many(self, items, first = None, last = None):
+        self.count += len(items)
+        self._time(first, last)
+        await super().write_many(items)
+
+    def commit(self):
+        if self.buffer:
+            self.blocks.append((self.count, _Nan(self.first), _Nan(self.last)))
+            self.count = 0
+            self.first = None
+            self.last = None
+        super().commit()
+
+    def _write(self, data):
+        # writer thread
+        count, first, last = self.blocks.popleft()
+        payload = self.compress(data)
+        block = BLOCK_HEADER.pack(len(payload), len(data), count, first, last)
+        offset = self.offset
+        super()._write(block + payload)
+        self.offset += len(block) + len(payload)
+        self.index.write(BLOCK_INDEX_ENTRY.pack(offset, len(payload), len(data), count, first, last))
+        if self.durability == FSYNC:
+            os.fsync(self.index.fileno())
+        return len(data)
+
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            self.index.close()
+
+def NextRotation(rotation, now, session_start = '17:00', timezone = None):
+    # wall clock time (seconds) of the first hour or session boundary after now
+    if rotation == HOUR:
+        return (now // 3600 + 1) * 3600
+    tz = None
+    if timezone is not None:
+        from zoneinfo import ZoneInfo
+        tz = ZoneInfo(timezone)
+    local = datetime.fromtimestamp(now, tz)
+    hour, minute = map(int, session_start.split(':'))
+    boundary = local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if boundary <= local:
+        boundary += timedelta(days=1)
+    return boundary.timestamp()
+
+
+class Manifest:
+
+    def __init__(self, path):
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.segments = []
+        if os.path.exists(path):
+            with open(path) as f:
+                self.segments = json.load(f)['segments']
+
+    def add(self, segment):
+        self.segments.append(segment)
+        self.save()
+
+    def save(self):
+        # replaced in one go, readers never see half a manifest
+        temp = self.path + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump({'segments': self.segments}, f, indent=1)
+        os.replace(temp, self.path)
+
+def IsManifest(path):
+    return path.endswith(MANIFEST_SUFFIX)
+
+def Segments(path, kind = None, start = None, end = None):
+    # paths of the segments in manifest path of kind that may hold messages
+    # timestamped between start and end, in the order they were written
+    manifest = Manifest(path)
+    paths = []
+    for segment in manifest.segments:
+        if kind is not None and segment['kind'] != kind:
+            continue
+        first, last = segment['first'], segment['last']
+        if segment['closed'] is not None:
+            if not segment['count']:
+                continue
+            if start is not None and last is not None and last < start:
+                continue
+        # the segment being written only has a lower bound so far
+        if end is not None and first is not None and first > end:
+            continue
+        paths.append(os.path.join(manifest.directory, segment['path']))
+    return paths
+
+
+class RotatingLog:
+
+    def __init__(self, path, kind, header = b'', append = False, rotation = None, max_size = 1 << 30,
+                 session_start = '17:00', timezone = None, manifest = None, symbols = (),
+                 compression = None, **writer_kwargs):
+        # Without rotation this is a GroupCommitWriter on path. With rotation
+        # segments path.<time> are written and listed in manifest (default
+        # path.manifest) and nothing is overwritten, append or not. kind and
+        # symbols are only for the manifest. With compression the log or its
+        # segments are written by a BlockWriter.
+        if rotation is not None and rotation not in ROTATIONS:
+            raise ValueError("Unknown rotation: %s" % rotation)
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression: %s" % compression)
+        self.path = path
+        self.kind = kind
+        self.header = header
+        self.rotation = rotation
+        self.max_size = max_size
+        self.session_start = session_start
+        self.timezone = timezone
+        self.symbols = list(symbols)
+        self.compression = compression
+        self.writer_kwargs = writer_kwargs
+        self.segment = None
+        self.size = 0
+        self.boundary = None
+        if rotation is None:
+            self.writer = self._writer(path, append)
+        else:
+            self.manifest = manifest or Manifest(path + MANIFEST_SUFFIX)
+            self._open()
+
+    def _writer(self, path, append):
+        if self.compression is not None:
+            return BlockWriter(path, append, header=self.header, compression=self.compression,
+                               **self.writer_kwargs)
+        return GroupCommitWriter(path, append, header=self.header, **self.writer_kwargs)
+
+    def _open(self):
+        now = time.time()
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now))
+        path = '%s.%s' % (self.path, stamp)
+        n = 1
+        while os.path.exists(path):
+            path = '%s.%s-%d' % (self.path, stamp, n)
+            n += 1
+        self.writer = self._writer(path, False)
+        self.size = len(self.header)
+        if self.rotation != SIZE:
+            self.boundary = NextRotation(self.rotation, now, self.session_start, self.timezone)
+        self.segment = {
+            'path': os.path.relpath(os.path.abspath(path), self.manifest.directory),
+            'kind': self.kind,
+            'symbols': self.symbols,
+            'opened': now,
+            'closed': None,
+            'first': None,
+            'last': None,
+            'count': 0,
+            'bytes': self.size,
+        }
+        self.manifest.add(self.segment)
+
+    def _close_segment(self):
+        self.segment['closed'] = time.time()
+        # the size on disk, less than what was written if compressed
+        self.segment['bytes'] = os.path.getsize(os.path.join(self.manifest.directory, self.segment['path']))
+        self.manifest.save()
+
+    async def _maybe_rotate(self, size):
+        if self.boundary is not None:
+            due = time.time() >= self.boundary
+        else:
+            # compressed segments by what is on disk so far
+            written = self.writer.offset if self.compression is not None else self.size + size
+            due = written > self.max_size and self.segment['count'] > 0
+        if due:
+            await self.writer.close()
+            self._close_segment()
+            self._open()
+
+    def _track(self, count, size, first, last):
+        segment = self.segment
+        segment['count'] += count
+        self.size += size
+        if first is not None:
+            # eg. backfilled trades arrive after newer ones
+            if segment['first'] is None or first < segment['first']:
+                segment['first'] = first
+            if segment['last'] is None or last > segment['last']:
+                segment['last'] = last
+
+    async def write(self, data, timestamp = None):
+        if self.segment is not None:
+            await self._maybe_rotate(len(data))
+            self._track(1, len(data), timestamp, timestamp)
+        if self.compression is not None:
+            await self.writer.write(data, timestamp)
+        else:
+            await self.writer.write(data)
+
+    async def write_many(self, items, first = None, last = None):
+        # first and last: the earliest and latest timestamp of items
+        if self.segment is not None:
+            size = sum(map(len, items))
+            await self._maybe_rotate(size)
+            self._track(len(items), size, first, last)
+        if self.compression is not None:
+            await self.writer.write_many(items, first, last)
+        else:
+            await self.writer.write_many(items)
+
+    async def close(self):
+        try:
+            await self.writer.close()
+        finally:
+            if self.segment is not None:
+                self._close_segment()
+
+
+
+def Main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['decode', 'decompress'], help="decode: raw log to JSON lines, decompress: compressed log to the log it holds")
+    parser.add_argument('--input', '-i', required=True, help="raw log recorded with DTCClient.py --raw, or compressed log")
+    parser.add_argument('--output', '-o', required=True, help="JSON lines log, or uncompressed log")
+    parser.add_argument('--heartbeats', default=False, action='store_true', help="keep heartbeats")
+
+    args = parser.parse_args()
+
+    if args.command == 'decompress':
+        size = 0
+        with open(args.output, 'wb') as out:
+            out.write(CompressedHeader(args.input))
+            for data in ReadBlocks(args.input):
+                out.write(data)
+                size += len(data)
+        print('Decompressed %d bytes' % size)
+        return
+
+    count = 0
+    with open(args.output, 'wb') as out:
+        for received_at, message in DecodeRaw(args.input):
+            if message.get('Type') == DTC.HEARTBEAT and not args.heartbeats:
+                continue
+            out.write(JSON.dumps(message) + b'\n')
+            count += 1
+    print('Decoded %d messages' % count)
+
+if __name__ == '__main__':
+    Main()
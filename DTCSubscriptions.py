@@ -0,0 +1,139 @@
+import DTCConstants as DTC
+from DTCQueue import AsyncMessageQueue, BLOCK, CONFLATE, END
+
+'''
+Market data and depth subscriptions of one DTCClientAsync connection.
+
+The manager hands out SymbolIDs, remembers what each symbol is subscribed to
+(so the requests can be replayed after a reconnect) and routes incoming
+messages to a per symbol queue or handler through a list indexed by SymbolID.
+Messages without a SymbolID, or for symbols subscribed with route=False, stay
+in the client's main stream.
+'''
+
+class Subscription:
+
+    def __init__(self, symbol, exchange, symbol_id, market_data, depth_levels, handler, queue):
+        self.symbol = symbol
+        self.exchange = exchange
+        self.symbol_id = symbol_id
+        self.market_data = market_data
+        self.depth_levels = depth_levels
+        self.handler = handler
+        self.queue = queue
+
+    def requests(self, action = DTC.SUBSCRIBE):
+        reqs = []
+        if self.market_data:
+            reqs.append({
+                "Type": DTC.MARKET_DATA_REQUEST,
+                "RequestAction": action,
+                "SymbolID": self.symbol_id,
+                "Symbol": self.symbol,
+                "Exchange": self.exchange
+            })
+        if self.depth_levels:
+            reqs.append({
+                "Type": DTC.MARKET_DEPTH_REQUEST,
+                "RequestAction": action,
+                "SymbolID": self.symbol_id,
+                "Symbol": self.symbol,
+                "Exchange": self.exchange,
+                "NumLevels": self.depth_levels
+            })
+        return reqs
+
+    async def messages(self):
+        while True:
+            res = await self.queue.get()
+            if res == END:
+                return
+            yield res
+
+
+class SubscriptionManager:
+
+    def __init__(self, client):
+        self.client = client
+        # (symbol, exchange) -> Subscription
+        self.subscriptions = {}
+        # SymbolID -> Subscription to route to, SymbolID 0 is never used
+        self.routes = [None]
+        self.free_ids = []
+        # number of routed subscriptions, the receiver skips routing when 0
+        self.active = 0
+
+    def _allocate(self, symbol_id = None):
+        if symbol_id is None:
+            if self.free_ids:
+                return self.free_ids.pop()
+            self.routes.append(None)
+            return len(self.routes) - 1
+        # an id chosen by the caller, eg. a DTCClientPool
+        if any(sub.symbol_id == symbol_id for sub in self.subscriptions.values()):
+            raise ValueError("SymbolID %d is in use" % symbol_id)
+        if symbol_id in self.free_ids:
+            self.free_ids.remove(symbol_id)
+        while len(self.routes) <= symbol_id:
+            self.routes.append(None)
+        return symbol_id
+
+    async def subscribe(self, symbol, exchange, market_data = True, depth_levels = 0,
+                        handler = None, route = True, queue_size = 0, overflow = BLOCK, symbol_id = None):
+        # Messages for the symbol go to handler(message) if given, otherwise
+        # to the subscription's queue (see Subscription.messages()). They are
+        # put from the receiver without waiting, so a bounded queue has to
+        # drop rather than block.
+        if (symbol, exchange) in self.subscriptions:
+            raise ValueError("Already subscribed to %s %s" % (symbol, exchange))
+        if queue_size and overflow in (BLOCK, CONFLATE):
+            raise ValueError("Bounded subscription queues need a drop overflow policy")
+
+        symbol_id = self._allocate(symbol_id)
+        queue = None
+        if route and handler is None:
+            queue = AsyncMessageQueue(queue_size, overflow)
+        sub = Subscription(symbol, exchange, symbol_id, market_data, depth_levels, handler, queue)
+
+        self.subscriptions[(symbol, exchange)] = sub
+        if route:
+            self.routes[symbol_id] = sub
+            self.active += 1
+
+        for req in sub.requests():
+            await self.client.send_json_request(req)
+        return sub
+
+    async def unsubscribe(self, symbol, exchange):
+        sub = self.subscriptions.pop((symbol, exchange))
+        for req in sub.requests(DTC.UNSUBSCRIBE):
+            await self.client.send_json_request(req)
+        if self.routes[sub.symbol_id] is not None:
+            self.routes[sub.symbol_id] = None
+            self.active -= 1
+        if sub.queue is not None:
+            sub.queue.put_nowait(END)
+        self.free_ids.append(sub.symbol_id)
+
+    def route(self, message):
+        # returns True if the message was taken by a subscription
+        symbol_id = message.get('SymbolID')
+        if symbol_id is None or symbol_id >= len(self.routes):
+            return False
+        sub = self.routes[symbol_id]
+        if sub is None:
+            return False
+        if sub.handler is not None:
+            sub.handler(message)
+        else:
+            sub.queue.put_nowait(message)
+        return True
+
+    def requests(self):
+        # subscribe requests for everything that is active, eg. to resubscribe
+        return [req for sub in self.subscriptions.values() for req in sub.requests()]
+
+    def close(self):
+        for sub in self.subscriptions.values():
+            if sub.queue is not None:
+                sub.queue.put_nowait(END)
@@ -0,0 +1,122 @@
+import asyncio as aio
+from DTCEncoding import FrameBuffer, ENCODING_LAYOUT
+
+'''
+Transports for DTCClientAsync.
+
+  protocol  an asyncio buffered protocol receiving straight into a FrameBuffer.
+            Every chunk the event loop reads is split into frames in one pass
+            and handed to the client from the read callback, without a
+            coroutine round trip per frame or per chunk. The default.
+  streams   aio.open_connection, frames are read with StreamReader.readuntil/
+            readexactly (or read() in batch mode) from the receiver task.
+
+Both run on uvloop as well, see UseUvloop().
+'''
+
+PROTOCOL = 'protocol'
+STREAMS = 'streams'
+
+TRANSPORTS = (PROTOCOL, STREAMS)
+
+def UseUvloop():
+    # makes uvloop the event loop policy if it is installed, returns whether it is
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    aio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+class FrameProtocol(aio.BufferedProtocol):
+
+    '''
+    on_frames(frames) is called with the frames (views into the receive buffer,
+    only valid during the call) completed by each read. The first 16 bytes are
+    the encoding response, see encoding_response(). The protocol also serves
+    as the client's writer: write(), drain(), close(), wait_closed() and
+    get_extra_info().
+    '''
+
+    def __init__(self, codec, on_frames, size = 1 << 16):
+        loop = aio.get_running_loop()
+        self.frames = FrameBuffer(codec, size)
+        self.on_frames = on_frames
+        self.transport = None
+        self.handshake = loop.create_future()
+        self.closed = loop.create_future()
+        self.held = False
+        self.writable = aio.Event()
+        self.writable.set()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint):
+        return self.frames.reserve()
+
+    def buffer_updated(self, nbytes):
+        self.frames.received(nbytes)
+        if not self.handshake.done():
+            res = self.frames.take(ENCODING_LAYOUT.size)
+            if res is None:
+                return
+            self.handshake.set_result(res)
+        if not self.held:
+            self._deliver()
+
+    def _deliver(self):
+        frames = self.frames.frames()
+        if frames:
+            self.on_frames(frames)
+
+    def connection_lost(self, exc):
+        if not self.handshake.done():
+            self.handshake.set_exception(ConnectionError("Connection closed during encoding negotiation"))
+        if not self.closed.done():
+            self.closed.set_result(exc)
+        self.writable.set()
+
+    async def encoding_response(self):
+        return await self.handshake
+
+    def hold(self):
+        # keep received frames in the buffer, unlike pause_reading() the
+        # encoding response is still handled
+        self.held = True
+
+    def release(self):
+        self.held = False
+        if self.handshake.done():
+            self._deliver()
+
+    def pause_reading(self):
+        self.transport.pause_reading()
+
+    def resume_reading(self):
+        if not self.transport.is_closing():
+            self.transport.resume_reading()
+
+    def pause_writing(self):
+        self.writable.clear()
+
+    def resume_writing(self):
+        self.writable.set()
+
+    def get_extra_info(self, name, default = None):
+        return self.transport.get_extra_info(name, default)
+
+    def write(self, data):
+        self.transport.write(data)
+
+    async def drain(self):
+        if self.transport.is_closing():
+            raise ConnectionResetError("Connection lost")
+        await self.writable.wait()
+
+    def close(self):
+        self.transport.close()
+
+    async def wait_closed(self):
+        await aio.shield(self.closed)
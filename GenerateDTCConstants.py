@@ -0,0 +1,64 @@
+#!python3
+
+import argparse
+import DTCProtocol_pb2 as DTC
+
+"""
+Generates DTCConstants.py from DTCProtocol_pb2, so the clients can use the
+protocol's constants without loading protobuf. Rerun it whenever
+DTCProtocol_pb2.py is regenerated.
+"""
+
+HEADER = '''# Generated by GenerateDTCConstants.py from DTCProtocol_pb2.py.  DO NOT EDIT!
+#
+# Enum values, message type numbers and per message field tables of the DTC
+# protocol, without the protobuf runtime.
+'''
+
+def MessageNames():
+    # DTCMessageType names are the upper snake case form of the message names,
+    # eg. MARKET_DATA_UPDATE_TRADE -> MarketDataUpdateTrade
+    names = {name.replace('_', '').lower(): name for name in DTC.DESCRIPTOR.message_types_by_name}
+    messages = {}
+    for value in DTC.DESCRIPTOR.enum_types_by_name['DTCMessageType'].values:
+        name = names.get(value.name.replace('_', '').lower())
+        if name is not None:
+            messages[value.number] = name
+    return messages
+
+def Generate(out):
+
+    out.write(HEADER)
+
+    for enum in DTC.DESCRIPTOR.enum_types_by_name.values():
+        out.write('\n# %s\n' % enum.name)
+        for value in enum.values:
+            out.write('%s = %d\n' % (value.name, value.number))
+
+    messages = MessageNames()
+
+    out.write('\n# message type -> protobuf message name\n')
+    out.write('MESSAGE_NAMES = {\n')
+    for _type, name in messages.items():
+        out.write('    %d: %r,\n' % (_type, name))
+    out.write('}\n')
+
+    out.write('\n# message type -> ((field name, default value), ...) in proto field order\n')
+    out.write('MESSAGE_FIELDS = {\n')
+    for _type, name in messages.items():
+        fields = DTC.DESCRIPTOR.message_types_by_name[name].fields
+        out.write('    %d: %r,\n' % (_type, tuple((f.name, f.default_value) for f in fields)))
+    out.write('}\n')
+
+def Main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', '-o', default='DTCConstants.py', help="Output file name")
+
+    args = parser.parse_args()
+
+    with open(args.output, 'w') as out:
+        Generate(out)
+
+if __name__ == '__main__':
+    Main()
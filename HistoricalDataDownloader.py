@@ -1,7 +1,7 @@
 # simple historical data downloader
 # this script will download tick-by-tick data from SC and save it as SYMBOL.csv file
 
-import DTCProtocol_pb2 as DTC
+import DTCConstants as DTC
 from DTCClient import DTCClient, DTCClientAsync
 import socket
 import json
@@ -0,0 +1,192 @@
+import DTCConstants as DTC
+import numpy as np
+from bisect import bisect_left, bisect_right, insort
+
+'''
+Limit order book built from MARKET_DEPTH messages.
+
+Each side is a NumPy ladder of quantities indexed by price in ticks, relative
+to self.base, with a sorted list of its occupied ladder indices. Best bid and
+ask are at the ends of the lists, so reading them, and finding the next one
+when the best level is deleted, is O(1). top(side, n) is O(n) and
+cumulative_depth() sums the occupied levels from the best one through the
+price; neither scans the ladders. Adding or deleting a level is a bisect into
+the list. The ladders are rebased, and grown if needed, when a price falls
+outside them.
+
+    book = OrderBook(tick_size=0.25)
+    book.attach(client, symbol_id=1)
+    ...
+    book.best_bid()           # (price, quantity) or None
+    book.top(DTC.AT_ASK, 10)  # prices, quantities, cumulative quantities
+'''
+
+SNAPSHOT_TYPES = {
+    DTC.MARKET_DEPTH_SNAPSHOT_LEVEL,
+    DTC.MARKET_DEPTH_SNAPSHOT_LEVEL_FLOAT,
+}
+
+UPDATE_TYPES = {
+    DTC.MARKET_DEPTH_UPDATE_LEVEL,
+    DTC.MARKET_DEPTH_UPDATE_LEVEL_FLOAT_WITH_MILLISECONDS,
+    DTC.MARKET_DEPTH_UPDATE_LEVEL_NO_TIMESTAMP,
+}
+
+class OrderBook:
+
+    def __init__(self, tick_size, num_ticks = 4096, symbol_id = None):
+        self.tick_size = tick_size
+        self.symbol_id = symbol_id
+        self.base = None
+        self.bids = np.zeros(num_ticks)
+        self.asks = np.zeros(num_ticks)
+        # ladder index of the best level, -1 when the side is empty
+        self.bid = -1
+        self.ask = -1
+        # occupied ladder indices, ascending
+        self.bid_levels = []
+        self.ask_levels = []
+        self.updates = 0
+
+    def attach(self, client, symbol_id = None):
+        # feed the book from a client's dispatcher, see DTCClient.on()
+        symbol_id = self.symbol_id if symbol_id is None else symbol_id
+        for _type in SNAPSHOT_TYPES | UPDATE_TYPES:
+            client.on(_type, self.apply, symbol_id)
+
+    def clear(self):
+        self.bids[:] = 0
+        self.asks[:] = 0
+        self.bid = self.ask = -1
+        self.bid_levels = []
+        self.ask_levels = []
+
+    def apply(self, message):
+        # returns False for messages that are not for this book
+        _type = message['Type']
+        if self.symbol_id is not None and message.get('SymbolID', self.symbol_id) != self.symbol_id:
+            return False
+
+        if _type in UPDATE_TYPES:
+            if message['UpdateType'] == DTC.MARKET_DEPTH_DELETE_LEVEL:
+                self.set_level(message['Side'], message['Price'], 0)
+            else:
+                self.set_level(message['Side'], message['Price'], message['Quantity'])
+
+        elif _type in SNAPSHOT_TYPES:
+            if message.get('IsFirstMessageInBatch') or \
+               message.get('FinalUpdateInBatch') == DTC.FINAL_UPDATE_BEGIN_BATCH:
+                self.clear()
+            # an empty book is sent as a single snapshot level without a side
+            if message.get('Side', DTC.BID_ASK_UNSET) != DTC.BID_ASK_UNSET:
+                self.set_level(message['Side'], message['Price'], message['Quantity'])
+
+        else:
+            return False
+
+        self.updates += 1
+        return True
+
+    def _index(self, price):
+        tick = int(round(price / self.tick_size))
+        if self.base is None:
+            self.base = tick - len(self.bids) // 2
+        index = tick - self.base
+        if index < 0 or index >= len(self.bids):
+            self._rebase(tick)
+            index = tick - self.base
+        return index
+
+    def _rebase(self, tick):
+        # center the ladders on the occupied range plus the new tick,
+        # doubling them while that range takes more than half of them
+        ends = [levels[i] for levels in (self.bid_levels, self.ask_levels) if levels for i in (0, -1)]
+        lo = hi = tick
+        if ends:
+            lo = min(lo, self.base + min(ends))
+            hi = max(hi, self.base + max(ends))
+
+        size = len(self.bids)
+        while hi - lo + 1 > size // 2:
+            size *= 2
+        base = (lo + hi) // 2 - size // 2
+
+        for side in ('bids', 'asks'):
+            old = getattr(self, side)
+            new = np.zeros(size)
+            if ends:
+                first, last = min(ends), max(ends) + 1
+                offset = self.base - base
+                new[first + offset : last + offset] = old[first:last]
+            setattr(self, side, new)
+
+        shift = self.base - base
+        self.bid_levels = [index + shift for index in self.bid_levels]
+        self.ask_levels = [index + shift for index in self.ask_levels]
+        if self.bid >= 0:
+            self.bid += shift
+        if self.ask >= 0:
+            self.ask += shift
+        self.base = base
+
+    def set_level(self, side, price, quantity):
+        index = self._index(price)
+        # taken after _index(), which may rebase the ladders
+        if side == DTC.AT_BID:
+            ladder, levels = self.bids, self.bid_levels
+        elif side == DTC.AT_ASK:
+            ladder, levels = self.asks, self.ask_levels
+        else:
+            return
+
+        occupied = ladder[index] > 0
+        ladder[index] = quantity
+        if quantity > 0:
+            if not occupied:
+                insort(levels, index)
+        elif occupied:
+            del levels[bisect_left(levels, index)]
+
+        if side == DTC.AT_BID:
+            self.bid = levels[-1] if levels else -1
+        else:
+            self.ask = levels[0] if levels else -1
+
+    def price(self, index):
+        return (self.base + index) * self.tick_size
+
+    def best_bid(self):
+        if self.bid < 0:
+            return None
+        return self.price(self.bid), self.bids[self.bid]
+
+    def best_ask(self):
+        if self.ask < 0:
+            return None
+        return self.price(self.ask), self.asks[self.ask]
+
+    def quantity(self, side, price):
+        index = int(round(price / self.tick_size)) - (self.base or 0)
+        ladder = self.bids if side == DTC.AT_BID else self.asks
+        return ladder[index] if 0 <= index < len(ladder) else 0
+
+    def cumulative_depth(self, side, price):
+        # total quantity from the best level through price
+        index = int(round(price / self.tick_size)) - (self.base or 0)
+        if side == DTC.AT_BID:
+            levels = self.bid_levels[bisect_left(self.bid_levels, index):]
+            return self.bids[levels].sum()
+        levels = self.ask_levels[:bisect_right(self.ask_levels, index)]
+        return self.asks[levels].sum()
+
+    def top(self, side, n):
+        # the n best levels of a side, best first:
+        # (prices, quantities, cumulative quantities)
+        if side == DTC.AT_BID:
+            levels = np.array(self.bid_levels[:-n - 1:-1] if n > 0 else [], int)
+            quantities = self.bids[levels]
+        else:
+            levels = np.array(self.ask_levels[:max(n, 0)], int)
+            quantities = self.asks[levels]
+        prices = (self.base + levels) * self.tick_size if levels.size else np.empty(0)
+        return prices, quantities, np.cumsum(quantities)